@@ -1,5 +1,8 @@
 # models.py
 import asyncio
+from array import array
+import base64
+from bisect import bisect_left, bisect_right, insort
 import csv
 from decimal import Decimal
 import enum
@@ -11,28 +14,40 @@ import re
 import secrets
 from sqlite3 import IntegrityError
 import string
+import threading
+import time
+from typing import Optional
 # models.py
 import aiohttp
 import jwt
 from sqlalchemy.dialects.postgresql import JSONB # Use JSONB for PostgreSQL for better performance
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 # from flask_jwt_extended import JWTManager
 from sqlalchemy.sql import func
 from flask_sqlalchemy import SQLAlchemy
 import datetime
 import json
-from urllib.parse import parse_qs, unquote, urlparse
-from flask import Blueprint, Flask, Response, request, jsonify, session
+from urllib.parse import parse_qs, parse_qsl, unquote, urlparse
+from flask import Blueprint, Flask, Response, g, request, jsonify, session
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from datetime import datetime, timedelta 
-from sqlalchemy import JSON, func, or_
+from sqlalchemy import JSON, and_, case, event, func, inspect, literal, or_, select, tuple_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import defer, load_only, with_polymorphic
+from sqlalchemy.sql.expression import ClauseElement, Executable
 from werkzeug.security import generate_password_hash, check_password_hash
 import hmac
+from itertools import islice
 import hashlib
 import os
 from functools import wraps
 from dotenv import load_dotenv
+from cache import BloomFilter, TTLCache
+from services.http_client import http_client
+from services.verification import CircuitOpen, Deadline, UpstreamError, VerificationTimeout, verification_engine
 # from backend.routes import admin_management
 from flask_cors import cross_origin
 
@@ -53,7 +68,7 @@ CORS(
     supports_credentials=True,
     allow_headers=["Content-Type", "Authorization", "X-Requested-With", "Accept"],
     methods=["GET", "POST", "PUT", "DELETE", "PATCH", "OPTIONS"],
-    expose_headers=["Content-Type", "Authorization", "X-Requested-With"]
+    expose_headers=["Content-Type", "Authorization", "X-Requested-With", "X-Next-Cursor"]
 )
 app.secret_key = 'replace-this-with-your-own-very-secret-key'
 # Add JWT secret to your config
@@ -70,7 +85,7 @@ app.config['SESSION_COOKIE_SAMESITE'] = 'None'
 app.config['SESSION_COOKIE_SECURE'] = True
 
 
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///mini_telegram_app.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///mini_telegram_app.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
 
@@ -246,12 +261,16 @@ class Transaction(db.Model):
     currency = db.Column(db.Enum(TransactionCurrency), nullable=False)
     status = db.Column(db.Enum(TransactionStatus), nullable=False, default=TransactionStatus.COMPLETED)
     description = db.Column(db.String(255))
-    transaction_id_on_blockchain = db.Column(db.String(255), nullable=True)  # NEW FIELD
+    transaction_id_on_blockchain = db.Column(db.String(255), nullable=True, index=True)  # NEW FIELD
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Relationship
     user = db.relationship('User', backref=db.backref('transactions', lazy='dynamic'))
 
+    __table_args__ = (
+        db.Index('idx_transaction_type_status_created', 'transaction_type', 'status', 'created_at'),
+    )
+
     def to_dict(self):
         return {
             "id": self.id,
@@ -296,13 +315,44 @@ friendships = db.Table('friendships',
 
 
 
+EPOCH_DATE = datetime(1970, 1, 1).date()
+
+
+def utc_day(moment=None) -> int:
+    """Days since 1970-01-01 (UTC) for moment, default now"""
+    return ((moment or datetime.utcnow()).date() - EPOCH_DATE).days
+
+
 user_daily_task_completions = db.Table(
     "user_daily_task_completions",
-    db.Column("user_id", db.BigInteger, db.ForeignKey("users.id"), primary_key=True),
-    db.Column("task_id", db.String, db.ForeignKey("daily_tasks.id"), primary_key=True),
+    db.Column("user_id", db.BigInteger, db.ForeignKey("users.id"), nullable=False),
+    db.Column("task_id", db.String, db.ForeignKey("daily_tasks.id"), nullable=False),
+    # UTC epoch-day the task was started; one row per user, task and day
+    db.Column("day", db.Integer, nullable=False, default=lambda: utc_day()),
     db.Column("started_at", db.TIMESTAMP, server_default=func.now()),
     db.Column("completed_at", db.TIMESTAMP),
-    db.Column("claimed", db.Boolean, default=False)  # ✅ track claim status
+    db.Column("claimed", db.Boolean, default=False),  # ✅ track claim status
+    db.PrimaryKeyConstraint("user_id", "day", "task_id")
+)
+
+# Rows from past days are moved here by compact_daily_task_completions()
+user_daily_task_completions_archive = db.Table(
+    "user_daily_task_completions_archive",
+    db.Column("user_id", db.BigInteger, nullable=False),
+    db.Column("task_id", db.String, nullable=False),
+    db.Column("day", db.Integer, nullable=False),
+    db.Column("started_at", db.TIMESTAMP),
+    db.Column("completed_at", db.TIMESTAMP),
+    db.Column("claimed", db.Boolean),
+    db.PrimaryKeyConstraint("user_id", "day", "task_id")
+)
+
+# Claimed completions per task per past day, for dashboard totals
+daily_task_completion_rollups = db.Table(
+    "daily_task_completion_rollups",
+    db.Column("day", db.Integer, primary_key=True),
+    db.Column("task_id", db.String, primary_key=True),
+    db.Column("completions", db.Integer, nullable=False, default=0, server_default="0")
 )
 
 
@@ -342,6 +392,10 @@ class User(db.Model):
     total_friends_invited = db.Column(db.Integer, nullable=False, default=0)
     
     banned = db.Column(db.Boolean, default=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # Bumped on every change to a serialized field; used for delta responses and the /user/me ETag
+    balance_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     
     # Daily tasks relationship
     daily_tasks = db.relationship(
@@ -358,7 +412,7 @@ class User(db.Model):
                               backref="friend_of")
 
     # Referral tracking
-    referred_by = db.Column(db.BigInteger, db.ForeignKey('users.id'), nullable=True)
+    referred_by = db.Column(db.BigInteger, db.ForeignKey('users.id'), nullable=True, index=True)
     referral_count = db.Column(db.Integer, default=0)
     total_referral_earnings = db.Column(db.BigInteger, default=0)
 
@@ -371,8 +425,12 @@ class User(db.Model):
                                 foreign_keys=[referred_by],
                                 backref=db.backref('referrer', remote_side=[id]))
     
-    def to_dict(self):
-        return {
+    def to_dict(self, friend_ids=None):
+        """
+        Serialize the user. Friends are only included when friend_ids is passed
+        (see friend_ids_by_user), so serializing never lazy-loads the friendships table.
+        """
+        data = {
             "id": self.id,
             "name": self.name,
             "coins": self.coins,
@@ -387,7 +445,6 @@ class User(db.Model):
             "space_defender_progress": self.space_defender_progress,
             "street_racing_progress": self.street_racing_progress,
             "banned": self.banned,
-            "friends": [friend.id for friend in self.friends],
             "referral_count": self.referral_count,
             "total_referral_earnings": self.total_referral_earnings,
             "referred_by": self.referred_by,
@@ -395,7 +452,73 @@ class User(db.Model):
             "total_social_tasks_completed": self.total_social_tasks_completed,
             "total_partner_tasks_completed": self.total_partner_tasks_completed,
             "total_friends_invited": self.total_friends_invited,
+            "balance_version": self.balance_version,
         }
+        if friend_ids is not None:
+            data["friends"] = friend_ids
+        return data
+
+    def to_delta(self):
+        """Only the fields changed by this request's flushes, plus the new balance_version"""
+        data = {}
+        for field in getattr(self, '_changed_fields', ()):
+            value = getattr(self, field)
+            data[field] = float(value) if field in ('ton', 'ad_credit') else value
+        data["balance_version"] = self.balance_version
+        return data
+
+
+# Every mapped column that to_dict exposes and that can change after signup
+USER_VERSIONED_FIELDS = tuple(
+    column.key for column in User.__table__.columns
+    if column.key not in ('id', 'created_at', 'balance_version')
+)
+
+
+@event.listens_for(User, 'before_update')
+def bump_balance_version(mapper, connection, target):
+    """Increment balance_version in the same UPDATE and remember what changed for to_delta"""
+    state = inspect(target)
+    changed = {field for field in USER_VERSIONED_FIELDS if state.attrs[field].history.has_changes()}
+    if changed:
+        target.balance_version = User.balance_version + 1
+        target._changed_fields = getattr(target, '_changed_fields', set()) | changed
+
+
+def user_payload(user) -> dict:
+    """
+    User part of a mutation response. Clients that send 'Prefer: return=minimal'
+    get {"delta": {...changed fields, balance_version}}; everyone else the full user.
+    """
+    if 'return=minimal' in request.headers.get('Prefer', ''):
+        return {"delta": user.to_delta()}
+    return {"user": user.to_dict()}
+
+
+def friend_ids_by_user(user_ids) -> dict:
+    """Friend IDs for many users with one query over friendships: {user_id: [friend_id, ...]}"""
+    result = {user_id: [] for user_id in user_ids}
+    if not result:
+        return result
+
+    rows = db.session.execute(
+        select(friendships.c.user_id, friendships.c.friend_id)
+        .where(friendships.c.user_id.in_(list(result)))
+    ).all()
+    for user_id, friend_id in rows:
+        result[user_id].append(friend_id)
+    return result
+
+
+def serialize_users(users, include_friends=False) -> list:
+    """Serialize a list of users, batching the friends lookup when it is requested"""
+    friends = friend_ids_by_user([user.id for user in users]) if include_friends else {}
+    return [user.to_dict(friend_ids=friends.get(user.id)) for user in users]
+
+
+def include_friends_requested() -> bool:
+    """Admin endpoints return friend IDs only with ?include_friends=true"""
+    return request.args.get('include_friends', 'false').lower() == 'true'
 
 # Quest Models
 class Quest(db.Model):
@@ -483,8 +606,72 @@ user_task_completion = db.Table('user_task_completions',
     db.Column('user_id', db.BigInteger, db.ForeignKey('users.id'), primary_key=True),
     db.Column('campaign_id', db.BigInteger, db.ForeignKey('user_campaigns.id'), primary_key=True),
     db.Column('started_at', db.TIMESTAMP, server_default=func.now()),  # Add this
-    db.Column('completed_at', db.TIMESTAMP)  # Keep this
+    db.Column('completed_at', db.TIMESTAMP),  # Keep this
+    db.Index('idx_user_task_completed', 'user_id', 'completed_at')
+)
+
+# Normalized copy of UserCampaign.langs so language filtering happens in an index.
+# Campaigns without language restrictions get a single '*' row.
+ANY_LANGUAGE = '*'
+campaign_langs = db.Table('campaign_langs',
+    db.Column('lang', db.String(10), primary_key=True),
+    db.Column('campaign_id', db.Integer, db.ForeignKey('user_campaigns.id'), primary_key=True)
+)
+
+# Completion tallies for hot tasks are spread over COMPLETION_SHARDS rows per task so
+# concurrent claimers lock different rows. Reads add the unfolded shards to the parent
+# completions column; fold_completion_shards() periodically moves them back.
+COMPLETION_SHARDS = int(os.getenv('COMPLETION_SHARDS', 16))
+CAMPAIGN_COUNTER = 'campaign'
+DAILY_TASK_COUNTER = 'daily_task'
+completion_shards = db.Table('completion_shards',
+    db.Column('counter', db.String(20), primary_key=True),
+    db.Column('task_id', db.Integer, primary_key=True),
+    db.Column('shard', db.SmallInteger, primary_key=True),
+    db.Column('count', db.Integer, nullable=False, default=0, server_default='0')
+)
+
+
+# Channel membership as reported to the bot by chat_member / my_chat_member updates.
+# chat_id is the channel's lowercased username (what campaign links name), or the
+# numeric id for chats without one. Rows only exist for channels the bot administers.
+channel_memberships = db.Table('channel_memberships',
+    db.Column('chat_id', db.String(64), primary_key=True),
+    db.Column('user_id', db.BigInteger, primary_key=True),
+    db.Column('status', db.String(20), nullable=False),
+    db.Column('updated_at', db.DateTime, nullable=False)
+)
+
+
+# /start events reported by partner bots, one row per (bot, user)
+bot_starts = db.Table('bot_starts',
+    db.Column('bot_username', db.String(64), primary_key=True),
+    db.Column('user_id', db.BigInteger, primary_key=True),
+    db.Column('started_at', db.DateTime, nullable=False),
+    # When we stored the row (started_at is partner-supplied); lets each worker's
+    # Bloom filter pick up starts ingested elsewhere
+    db.Column('recorded_at', db.DateTime, index=True)
+)
+
+
+# Claims accepted while their subscription check couldn't run (deadline spent or
+# Telegram's breaker open); process_pending_claims() verifies and pays them later
+pending_claims = db.Table('pending_claims',
+    db.Column('user_id', db.BigInteger, db.ForeignKey('users.id'), primary_key=True),
+    db.Column('campaign_id', db.BigInteger, db.ForeignKey('user_campaigns.id'), primary_key=True),
+    db.Column('queued_at', db.DateTime, nullable=False),
+    db.Column('attempts', db.Integer, nullable=False, default=0, server_default='0'),
+    db.Index('idx_pending_claims_queued_at', 'queued_at')
 )
+
+
+def pending_completions_expr(counter: str, task_id_column):
+    return db.column_property(
+        select(func.coalesce(func.sum(completion_shards.c.count), 0))
+        .where((completion_shards.c.counter == counter) & (completion_shards.c.task_id == task_id_column))
+        .correlate_except(completion_shards)
+        .scalar_subquery()
+    )
 # Tracks friendships (many-to-many relationship on User)
 
 
@@ -499,6 +686,7 @@ class UserCampaign(db.Model):
     
     status = db.Column(db.Enum(CampaignStatus), default=CampaignStatus.ACTIVE)
     completions = db.Column(db.Integer, default=0)
+    pending_completions = pending_completions_expr(CAMPAIGN_COUNTER, id)
     goal = db.Column(db.Integer, nullable=False)  # number of users
     cost = db.Column(db.Numeric(12, 4), nullable=False)  # how many coins claimed
     category = db.Column(db.Enum(TaskCategory), nullable=False)
@@ -519,13 +707,17 @@ class UserCampaign(db.Model):
         'polymorphic_on': type
     }
 
+    @property
+    def total_completions(self) -> int:
+        return (self.completions or 0) + (self.pending_completions or 0)
+
     def to_dict(self):
         return {
             'id': self.id,
             'creator_id': self.creator_id,
             'link': self.link,
             'status': self.status.name if self.status else None,
-            'completions': self.completions,
+            'completions': self.total_completions,
             'goal': self.goal,
             'cost': str(self.cost),  # Convert Decimal to string for JSON
             'category': self.category.name if self.category else None,
@@ -582,7 +774,7 @@ class UserGameProgress(db.Model):
     user = db.relationship('User', backref='game_progress')
     
     __table_args__ = (
-        db.Index('idx_user_game', 'user_id', 'game_id'),
+        db.Index('idx_user_game', 'user_id', 'game_id', unique=True),
     )
 
 class LevelCompletion(db.Model):
@@ -596,6 +788,10 @@ class LevelCompletion(db.Model):
     
     # Relationship
     campaign = db.relationship('UserCampaign', backref='level_completions')
+    
+    __table_args__ = (
+        db.Index('uq_level_completion_user_campaign', 'user_id', 'campaign_id', unique=True),
+    )
 
 class DailyTask(db.Model):
     __tablename__ = "daily_tasks"
@@ -611,6 +807,7 @@ class DailyTask(db.Model):
     link = db.Column(db.String, nullable=False)
     status = db.Column(db.Enum(CampaignStatus), default=CampaignStatus.ACTIVE)
     completions = db.Column(db.Integer, default=0)
+    pending_completions = pending_completions_expr(DAILY_TASK_COUNTER, id)
 
     # ✅ New column: task_type
     task_type = db.Column(db.String, default="general", nullable=False)
@@ -635,7 +832,7 @@ class DailyTask(db.Model):
             "category": self.category,
             "link": self.link,
             "status": self.status.value if self.status else None,
-            "completions": self.completions,
+            "completions": (self.completions or 0) + (self.pending_completions or 0),
             "taskType": self.task_type,  # ✅ expose as camelCase
             "ad_network_id": self.ad_network_id,
             "created_at": self.created_at.isoformat() if self.created_at else None,
@@ -702,6 +899,91 @@ class SpinHistory(db.Model):
     # Relationship
     user = db.relationship('User', backref=db.backref('spin_history', lazy='dynamic'))
 
+    __table_args__ = (
+        db.Index('idx_spin_history_user_created', 'user_id', 'created_at'),
+    )
+
+
+class Explain(Executable, ClauseElement):
+    """EXPLAIN wrapper around a select, compiled for the current dialect"""
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(Explain)
+def compile_explain(element, compiler, **kw):
+    prefix = "EXPLAIN QUERY PLAN " if compiler.dialect.name == 'sqlite' else "EXPLAIN "
+    # Keep the select's columns out of the result map; EXPLAIN returns plan rows
+    with compiler._nested_result():
+        return prefix + compiler.process(element.statement, **kw)
+
+
+def hot_queries() -> dict:
+    """The predicates the request paths lean on; each must be answerable from an index"""
+    now = datetime.utcnow()
+    return {
+        "completed campaigns for user": select(user_task_completion.c.campaign_id).where(
+            (user_task_completion.c.user_id == 1) & (user_task_completion.c.completed_at.isnot(None))
+        ),
+        "campaign status for user": select(user_task_completion).where(
+            (user_task_completion.c.user_id == 1) & (user_task_completion.c.campaign_id.in_([1, 2]))
+        ),
+        "daily tasks started today": select(user_daily_task_completions).where(
+            (user_daily_task_completions.c.user_id == 1) &
+            (user_daily_task_completions.c.day == utc_day(now))
+        ),
+        "pending withdrawals": select(Transaction.id).where(
+            (Transaction.transaction_type == TransactionType.WITHDRAWAL) &
+            (Transaction.status == TransactionStatus.PENDING)
+        ).order_by(Transaction.created_at.desc()),
+        "blockchain double-spend check": select(Transaction.id).where(
+            Transaction.transaction_id_on_blockchain == 'hash'
+        ),
+        "referred users": select(User.id).where(User.referred_by == 1),
+        "referrals made": select(Referral.id).where(Referral.referrer_id == 1),
+        "spin history": select(SpinHistory.id).where(SpinHistory.user_id == 1)
+            .order_by(SpinHistory.created_at.desc()).limit(20),
+        "game progress": select(UserGameProgress.id).where(
+            (UserGameProgress.user_id == 1) & (UserGameProgress.game_id == 'game')
+        ),
+        "campaigns by language": select(campaign_langs.c.campaign_id).where(
+            campaign_langs.c.lang.in_(['en', ANY_LANGUAGE])
+        ),
+    }
+
+
+def find_full_scans(statement) -> list:
+    """Plan lines showing a full table scan for statement on the current database"""
+    with db.engine.connect() as connection:
+        if connection.dialect.name == 'postgresql':
+            # Small tables make a seq scan the cheapest plan; forbid it so only a
+            # missing index can produce one
+            connection.exec_driver_sql("SET enable_seqscan = off")
+            lines = [row[0] for row in connection.execute(Explain(statement))]
+            return [line for line in lines if 'Seq Scan' in line]
+
+        details = [row[-1] for row in connection.execute(Explain(statement))]
+        return [d for d in details if re.match(r'SCAN \w+', d) and 'USING' not in d]
+
+
+@app.cli.command("check-query-plans")
+@with_appcontext
+def check_query_plans():
+    """EXPLAIN every hot query and fail if any of them needs a full table scan"""
+    failures = 0
+    for name, statement in hot_queries().items():
+        scans = find_full_scans(statement)
+        if scans:
+            failures += 1
+            click.echo(f"❌ {name}: {'; '.join(scans)}")
+        else:
+            click.echo(f"✅ {name}")
+
+    if failures:
+        raise SystemExit(1)
+
 
 
 
@@ -718,7 +1000,15 @@ def get_current_user():
     user = current_user()
     if not user:
         return jsonify({"error": "Not authenticated"}), 401
-    return jsonify(user.to_dict()) # Return the logged-in user's data
+
+    # balance_version changes with every serialized field, so it doubles as the ETag
+    etag = f"{user.id}-{user.balance_version}"
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = jsonify(user.to_dict()) # Return the logged-in user's data
+    response.set_etag(etag)
+    return response
 
 
 
@@ -782,6 +1072,48 @@ def refresh_token():
         return jsonify({"error": "Invalid or expired token"}), 401
 
 
+# Verified token -> (user_id, exp). Tokens are re-sent on every request, so jwt.decode
+# and the ban check run once per token per worker every JWT_CACHE_TTL seconds. The TTL
+# bounds how long a ban made on another worker takes to apply here.
+JWT_CACHE_TTL = int(os.getenv('JWT_CACHE_TTL', 120))
+JWT_CACHE = TTLCache(maxsize=int(os.getenv('JWT_CACHE_SIZE', 50000)), ttl=JWT_CACHE_TTL)
+
+
+def invalidate_user_tokens(user_id: int) -> int:
+    """
+    Drop this worker's cached tokens for a user so the next request is re-verified
+    (e.g. after a ban); other workers pick it up within JWT_CACHE_TTL.
+    """
+    return JWT_CACHE.discard_if(lambda entry: entry[0] == user_id)
+
+
+def decode_user_token(token: str) -> int:
+    """
+    Return the user_id for a valid token, using JWT_CACHE when possible.
+    Raises jwt.ExpiredSignatureError / jwt.InvalidTokenError like jwt.decode,
+    and PermissionError if the user is banned.
+    """
+    cached = JWT_CACHE.get(token)
+    if cached is not None:
+        user_id, exp = cached
+        if exp > time.time():
+            return user_id
+        JWT_CACHE.pop(token)
+        raise jwt.ExpiredSignatureError("Signature has expired")
+
+    payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+    user_id = payload['user_id']
+
+    # Re-checked whenever the cache entry lapses, at least every JWT_CACHE_TTL seconds
+    if db.session.query(User.banned).filter(User.id == user_id).scalar():
+        raise PermissionError("Account is banned")
+
+    exp = payload.get('exp')
+    if exp is not None:
+        JWT_CACHE.set(token, (user_id, exp), ttl=min(max(exp - time.time(), 0), JWT_CACHE_TTL))
+    return user_id
+
+
 # Create a JWT required decorator
 def jwt_required(f):
     @wraps(f)
@@ -792,59 +1124,138 @@ def jwt_required(f):
         
         try:
             token = token.replace('Bearer ', '')
-            payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-            request.user_id = payload['user_id']
+            request.user_id = decode_user_token(token)
         except jwt.ExpiredSignatureError:
             return jsonify({"error": "Token expired"}), 401
         except jwt.InvalidTokenError:
             return jsonify({"error": "Invalid token"}), 401
+        except PermissionError:
+            return jsonify({"error": "Account is banned"}), 403
             
         return f(*args, **kwargs)
     return decorated_function
 
-# Add this function to validate Telegram authentication
-def validate_telegram_init_data_simple(init_data: str, bot_token: str) -> bool:
+def get_request_user(user_id=None, columns=None):
     """
-    Simplified validation that handles common parsing issues
+    Load a user at most once per request; every later lookup for the same ID
+    in this request gets the same object back. Defaults to the JWT user.
+    Game-progress JSON is deferred unless asked for; pass columns to load only those.
     """
+    if user_id is None:
+        user_id = getattr(request, 'user_id', None)
     try:
-        # Parse the query string
-        parsed = parse_qs(init_data)
-        
-        # Get the hash
-        hash_value = parsed.get('hash', [''])[0]
+        user_id = int(user_id)
+    except (TypeError, ValueError):
+        return None
+
+    users = g.setdefault('users', {})
+    if user_id not in users:
+        if columns:
+            options = [load_only(*columns)]
+        else:
+            options = [defer(User.space_defender_progress), defer(User.street_racing_progress)]
+        users[user_id] = db.session.get(User, user_id, options=options)
+    return users[user_id]
+
+
+# Telegram Mini App initData verification
+TELEGRAM_BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN')
+
+# HMAC key for initData is derived from the bot token once, not on every login
+TELEGRAM_WEBAPP_SECRET = hmac.new(
+    key=b"WebAppData",
+    msg=TELEGRAM_BOT_TOKEN.encode(),
+    digestmod=hashlib.sha256
+).digest() if TELEGRAM_BOT_TOKEN else None
+
+VALID_LANGUAGE_CODES = ['en', 'es', 'fr', 'de', 'it', 'pt', 'ru', 'zh', 'ja', 'ar', 'hi', 'tr']
+
+# Recently verified initData -> parsed result. The Mini App re-sends the same
+# initData on every reopen, so a push broadcast turns into a burst of identical logins.
+INIT_DATA_CACHE = TTLCache(
+    maxsize=int(os.getenv('INIT_DATA_CACHE_SIZE', 10000)),
+    ttl=int(os.getenv('INIT_DATA_CACHE_TTL', 300))
+)
+
+
+def parse_referral_param(value: str):
+    """Return the referrer ID from a 'ref_<id>' start parameter, or None"""
+    if not value or not value.startswith('ref_'):
+        return None
+    try:
+        return int(value[4:])
+    except ValueError:
+        return None
+
+
+def verify_telegram_init_data(init_data: str) -> dict:
+    """
+    Verify the initData signature and extract user, language and referral
+    data in a single pass over the query string.
+    Signature checking is skipped when TELEGRAM_BOT_TOKEN is not configured (local dev).
+    """
+    cached = INIT_DATA_CACHE.get(init_data)
+    if cached is not None:
+        return cached
+
+    hash_value = None
+    user_param = None
+    referral_params = {}
+    data_check_list = []
+
+    for key, value in parse_qsl(init_data, keep_blank_values=True):
+        if key == 'hash':
+            hash_value = value
+            continue
+        data_check_list.append(f"{key}={value}")
+        if key == 'user':
+            user_param = value
+        elif key in ('startapp', 'start_param', 'start'):
+            referral_params[key] = value
+
+    if TELEGRAM_WEBAPP_SECRET:
         if not hash_value:
-            return False
-        
-        # Create data check string
-        data_check_list = []
-        for key in sorted(parsed.keys()):
-            if key == 'hash':
-                continue
-            for value in parsed[key]:
-                data_check_list.append(f"{key}={value}")
-        
-        data_check_string = "\n".join(data_check_list)
-        
-        # Calculate secret key
-        secret_key = hmac.new(
-            key=b"WebAppData",
-            msg=bot_token.encode(),
-            digestmod=hashlib.sha256
-        ).digest()
-        
-        # Calculate expected hash
+            return {"success": False, "status": 401, "message": "initData hash is missing"}
+
+        data_check_list.sort()
         expected_hash = hmac.new(
-            key=secret_key,
-            msg=data_check_string.encode(),
+            key=TELEGRAM_WEBAPP_SECRET,
+            msg="\n".join(data_check_list).encode(),
             digestmod=hashlib.sha256
         ).hexdigest()
-        
-        return hmac.compare_digest(hash_value, expected_hash)
-        
-    except Exception as e:
-        print(f"Validation error: {e}")
-        return False
+
+        if not hmac.compare_digest(hash_value, expected_hash):
+            return {"success": False, "status": 401, "message": "Invalid initData signature"}
+
+    if not user_param:
+        return {"success": False, "status": 400, "message": "User data is missing from initData"}
+
+    try:
+        user_data = json.loads(user_param)
+    except json.JSONDecodeError:
+        return {"success": False, "status": 400, "message": "Failed to decode user JSON"}
+
+    if not isinstance(user_data, dict) or not user_data.get('id'):
+        return {"success": False, "status": 400, "message": "Invalid user data in initData"}
+
+    language_code = user_data.get('language_code', 'en')
+    if language_code not in VALID_LANGUAGE_CODES:
+        language_code = 'en'  # Default to English if invalid
+
+    referred_by_id = None
+    for key in ('startapp', 'start_param', 'start'):
+        referred_by_id = parse_referral_param(referral_params.get(key))
+        if referred_by_id:
+            break
+
+    result = {
+        "success": True,
+        "user": user_data,
+        "language_code": language_code,
+        "referred_by_id": referred_by_id
+    }
+    INIT_DATA_CACHE.set(init_data, result)
+    return result
 
 
 
@@ -875,6 +1286,119 @@ def dev_login(user_id):
 
     return jsonify(user_data)
 
+def dialect_insert(table):
+    """INSERT construct for the active database, so ON CONFLICT / RETURNING are available"""
+    if db.engine.dialect.name == 'postgresql':
+        return pg_insert(table)
+    return sqlite_insert(table)
+
+
+def upsert_telegram_user(telegram_id: int, name: str, language_code: str, referred_by_id):
+    """
+    Create or refresh a user in a single INSERT ... ON CONFLICT DO UPDATE ... RETURNING.
+    The referrer is validated inside the statement, and an existing referral is never replaced.
+    Returns (user, is_new_user).
+    """
+    now = datetime.utcnow()
+    referrer_id = select(User.id).where(User.id == referred_by_id).scalar_subquery() if referred_by_id else None
+
+    stmt = dialect_insert(User).values(
+        id=telegram_id,
+        name=name,
+        language_code=language_code,
+        coins=0,
+        ton=0,
+        referral_earnings=0,
+        spins=10,
+        ad_credit=0,
+        ads_watched_today=0,
+        tasks_completed_today_for_spin=0,
+        friends_invited_today_for_spin=0,
+        space_defender_progress={"weaponLevel": 1, "shieldLevel": 1, "speedLevel": 1},
+        street_racing_progress={
+            "currentCar": 1,
+            "unlockedCars": [1],
+            "carUpgrades": {},
+            "careerPoints": 0,
+            "adProgress": {"engine": 0, "tires": 0, "nitro": 0}
+        },
+        total_game_tasks_completed=0,
+        total_social_tasks_completed=0,
+        total_partner_tasks_completed=0,
+        total_friends_invited=0,
+        banned=False,
+        referred_by=referrer_id,
+        referral_count=0,
+        total_referral_earnings=0,
+        created_at=now
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[User.id],
+        set_={
+            'name': stmt.excluded.name,
+            'language_code': stmt.excluded.language_code,
+            'referred_by': func.coalesce(User.referred_by, stmt.excluded.referred_by),
+            'balance_version': case(
+                (or_(
+                    User.name != stmt.excluded.name,
+                    User.language_code != stmt.excluded.language_code,
+                    and_(User.referred_by.is_(None), stmt.excluded.referred_by.isnot(None))
+                ), User.balance_version + 1),
+                else_=User.balance_version
+            )
+        }
+    ).returning(User)
+
+    user = db.session.scalars(stmt, execution_options={"populate_existing": True}).one()
+
+    # The conflict branch never touches created_at, so only a fresh insert carries our timestamp
+    is_new_user = user.created_at == now
+    return user, is_new_user
+
+
+def apply_referral_signup(referrer_id: int, referred_id: int):
+    """
+    Record a new referral and credit the referrer (+1 referral, +1 spin, +1 invite today).
+    The referral row is inserted with ON CONFLICT DO NOTHING and the referrer is only
+    credited when that insert actually happened, so a retried login can't double-credit.
+    """
+    referrals_table = Referral.__table__
+    users_table = User.__table__
+
+    inserted = dialect_insert(referrals_table).values(
+        referrer_id=referrer_id,
+        referred_id=referred_id,
+        created_at=datetime.utcnow(),
+        earnings_generated=0
+    ).on_conflict_do_nothing(index_elements=['referrer_id', 'referred_id'])
+
+    credit_referrer = dict(
+        referral_count=func.coalesce(users_table.c.referral_count, 0) + 1,
+        spins=users_table.c.spins + 1,
+        friends_invited_today_for_spin=users_table.c.friends_invited_today_for_spin + 1,
+        total_friends_invited=users_table.c.total_friends_invited + 1,
+        balance_version=users_table.c.balance_version + 1
+    )
+
+    if db.engine.dialect.name == 'postgresql':
+        # One round trip: insert the referral and credit the referrer from the same CTE
+        new_referral = inserted.returning(referrals_table.c.referrer_id).cte('new_referral')
+        db.session.execute(
+            users_table.update()
+            .where(users_table.c.id.in_(select(new_referral.c.referrer_id)))
+            .values(**credit_referrer)
+        )
+        return
+
+    # SQLite has no data-modifying CTEs
+    if db.session.execute(inserted.returning(referrals_table.c.referrer_id)).first():
+        db.session.execute(
+            users_table.update()
+            .where(users_table.c.id == referrer_id)
+            .values(**credit_referrer)
+        )
+
+
 @app.route('/auth/telegram', methods=['POST'])
 def auth_with_telegram():
     data = request.get_json()
@@ -885,207 +1409,32 @@ def auth_with_telegram():
         return jsonify({"error": "initData is required"}), 400
 
     try:
-        # Parse the init data
-        parsed_data = parse_qs(init_data_str)
-        
-        # Get the user parameter
-        user_params = parsed_data.get('user')
-        if not user_params:
-            return jsonify({"error": "User data is missing from initData"}), 400
+        # Verify signature and extract everything we need in one pass
+        init_data = verify_telegram_init_data(init_data_str)
+        if not init_data["success"]:
+            return jsonify({"error": init_data["message"]}), init_data["status"]
 
-        # Parse the JSON user data
-        user_param = user_params[0]
-        user_data = json.loads(user_param)
+        user_data = init_data["user"]
+        telegram_id = user_data['id']
+        user_language_code = init_data["language_code"]
 
-        telegram_id = user_data.get('id')
-        if not telegram_id:
-            return jsonify({"error": "Invalid user data in initData"}), 400
+        # Frontend startParam (from the Telegram WebApp SDK) wins over initData deep-link params
+        referred_by_id = parse_referral_param(start_param_from_frontend) or init_data["referred_by_id"]
 
-        # Extract language code from Telegram user data
-        user_language_code = user_data.get('language_code', 'en')
-        
-        # Validate and normalize language code
-        valid_language_codes = ['en', 'es', 'fr', 'de', 'it', 'pt', 'ru', 'zh', 'ja', 'ar', 'hi', 'tr']
-        if user_language_code not in valid_language_codes:
-            user_language_code = 'en'  # Default to English if invalid
-        
-        print(f"🌐 User language from Telegram: {user_language_code}")
+        print(f"👤 User ID: {telegram_id}, language: {user_language_code}, referred by: {referred_by_id}")
 
-        referred_by_id = None
-        
-        # FIRST: Check for start parameter from frontend (most reliable - from Telegram WebApp SDK)
-        if start_param_from_frontend and start_param_from_frontend.startswith('ref_'):
-            try:
-                referred_by_id = int(start_param_from_frontend.replace('ref_', ''))
-                print(f"🔗 Found referral from frontend startParam: {referred_by_id}")
-            except (ValueError, AttributeError):
-                referred_by_id = None
-                print("❌ Invalid startParam format from frontend")
-        
-        # SECOND: Check in initData for startapp parameter (deep links)
-        if not referred_by_id:
-            startapp_params = parsed_data.get('startapp')
-            if startapp_params:
-                try:
-                    startapp_param = startapp_params[0]
-                    if startapp_param.startswith('ref_'):
-                        referred_by_id = int(startapp_param.replace('ref_', ''))
-                        print(f"🔗 Found referral from startapp: {referred_by_id}")
-                except (ValueError, AttributeError):
-                    referred_by_id = None
-                    print("❌ Invalid startapp parameter format")
-        
-        # THIRD: Check for regular start parameter (web compatibility)
-        if not referred_by_id:
-            start_params = parsed_data.get('start')
-            if start_params:
-                try:
-                    start_param = start_params[0]
-                    if start_param.startswith('ref_'):
-                        referred_by_id = int(start_param.replace('ref_', ''))
-                        print(f"🔗 Found referral from start: {referred_by_id}")
-                except (ValueError, AttributeError):
-                    referred_by_id = None
-                    print("❌ Invalid start parameter format")
-
-        # FOURTH: Check the initData string directly (fallback)
-        if not referred_by_id and init_data_str:
-            try:
-                # Look for start parameters in the raw initData string
-                start_patterns = [r'start=ref_(\d+)', r'startapp=ref_(\d+)']
-                for pattern in start_patterns:
-                    match = re.search(pattern, init_data_str)
-                    if match:
-                        referred_by_id = int(match.group(1))
-                        print(f"🔗 Found referral from initData string pattern: {referred_by_id}")
-                        break
-            except (ValueError, re.error):
-                referred_by_id = None
-
-        # Debug output
-        print(f"👤 User ID: {telegram_id}")
-        print(f"🌐 User Language: {user_language_code}")
-        print(f"📋 Start param from frontend: {start_param_from_frontend}")
-        print(f"🎯 Referred by ID: {referred_by_id}")
-
-        # Validate referrer
-        if referred_by_id:
-            if referred_by_id == telegram_id:
-                referred_by_id = None  # Prevent self-referral
-                print("🚫 Self-referral detected, ignoring")
-            else:
-                referrer = User.query.get(referred_by_id)
-                if not referrer:
-                    referred_by_id = None  # Referrer doesn't exist
-                    print("❌ Referrer not found in database")
-                else:
-                    print(f"✅ Valid referrer found: {referrer.name} (ID: {referrer.id})")
+        if referred_by_id == telegram_id:
+            referred_by_id = None  # Prevent self-referral
+            print("🚫 Self-referral detected, ignoring")
 
-        # Use get_or_create pattern with race condition handling
-        user = None
-        is_new_user = False
-        
-        # First try to get existing user
-        user = User.query.get(telegram_id)
-        
-        if user:
-            # Existing user - update name and language if changed
-            new_name = user_data.get('username') or f"{user_data.get('first_name', '')} {user_data.get('last_name', '')}".strip() or "Anonymous"
-            if user.name != new_name:
-                user.name = new_name
-                print(f"📝 Updated user name: {user.name}")
-            
-            # Update language if different
-            if user.language_code != user_language_code:
-                user.language_code = user_language_code
-                print(f"🌐 Updated user language: {user.language_code}")
-            
-            # Only set referral if user doesn't have one already and referral is valid
-            if not user.referred_by and referred_by_id and referred_by_id != user.id:
-                user.referred_by = referred_by_id
-                print(f"🔗 Updated existing user referral: {telegram_id} -> {referred_by_id}")
-        else:
-            # New user - try to create with race condition handling
-            is_new_user = True
-            try:
-                user = User(
-                    id=telegram_id,
-                    name=user_data.get('username') or 
-                         f"{user_data.get('first_name', '')} {user_data.get('last_name', '')}".strip() or 
-                         "Anonymous",
-                    language_code=user_language_code,  # Set language from Telegram
-                    coins=0,
-                    ton=0.0,
-                    referral_earnings=0,
-                    spins=10,
-                    ad_credit=0.0,
-                    ads_watched_today=0,
-                    tasks_completed_today_for_spin=0,
-                    friends_invited_today_for_spin=0,
-                    space_defender_progress={"weaponLevel": 1, "shieldLevel": 1, "speedLevel": 1},
-                    street_racing_progress={
-                        "currentCar": 1, 
-                        "unlockedCars": [1], 
-                        "carUpgrades": {}, 
-                        "careerPoints": 0, 
-                        "adProgress": {"engine": 0, "tires": 0, "nitro": 0}
-                    },
-                    banned=False,
-                    referred_by=referred_by_id,
-                    referral_count=0,
-                    total_referral_earnings=0
-                )
-                db.session.add(user)
-                db.session.flush()  # Test if we can add without commit
-                print(f"✅ Created new user: {telegram_id}, language: {user_language_code}, referred by: {referred_by_id}")
-                
-            except IntegrityError:
-                # Race condition: user was already created by another request
-                db.session.rollback()
-                print(f"⚠️  Race condition detected for user {telegram_id}, retrieving existing user...")
-                
-                # Get the user that was created by the other request
-                user = User.query.get(telegram_id)
-                if user:
-                    is_new_user = False
-                    print(f"✅ Retrieved existing user after race condition: {user.name}")
-                else:
-                    # If user still doesn't exist, re-raise the error
-                    raise
-
-        # Update referrer's count for new users only
-        if is_new_user and referred_by_id and referred_by_id != user.id:
-            referrer = User.query.get(referred_by_id)
-            if referrer:
-                referrer.referral_count += 1
-                
-                # AWARD 1 SPIN TO REFERRER FOR SUCCESSFUL REFERRAL
-                referrer.spins += 1
-                user.total_friends_invited+=1
-                
-                # INCREASE FRIEND INVITATION COUNT FOR TODAY
-                referrer.friends_invited_today_for_spin += 1
-                
-                # Create referral record (check if it already exists first)
-                existing_referral = Referral.query.filter_by(
-                    referrer_id=referred_by_id,
-                    referred_id=user.id
-                ).first()
-                
-                if not existing_referral:
-                    referral = Referral(
-                        referrer_id=referred_by_id,
-                        referred_id=user.id,
-                        earnings_generated=0
-                    )
-                    db.session.add(referral)
-                    print(f"📊 Created referral record: {referrer.id} -> {user.id}")
-                else:
-                    print(f"📊 Referral record already exists: {referrer.id} -> {user.id}")
-                
-                print(f"📈 Updated referrer count: {referrer.referral_count}")
-                print(f"🎰 Awarded 1 spin to referrer {referrer.id} for new referral")
-                print(f"👥 Increased friend invitation count for today: {referrer.friends_invited_today_for_spin}")
+        name = user_data.get('username') or f"{user_data.get('first_name', '')} {user_data.get('last_name', '')}".strip() or "Anonymous"
+
+        # Create or refresh the user; an unknown referrer is dropped inside the upsert
+        user, is_new_user = upsert_telegram_user(telegram_id, name, user_language_code, referred_by_id)
+
+        if is_new_user and user.referred_by:
+            apply_referral_signup(user.referred_by, user.id)
+            print(f"📊 Recorded referral: {user.referred_by} -> {user.id}")
 
         db.session.commit()
 
@@ -1111,23 +1460,6 @@ def auth_with_telegram():
     except json.JSONDecodeError as e:
         print(f"❌ JSON decode error: {e}")
         return jsonify({"error": "Failed to decode user JSON"}), 400
-    except IntegrityError as e:
-        db.session.rollback()
-        print(f"❌ Database integrity error: {e}")
-        # Try to get the user that might have been created
-        user = User.query.get(telegram_id)
-        if user:
-            # If user exists, return them anyway
-            token_payload = {
-                'user_id': user.id,
-                'exp': datetime.utcnow() + timedelta(days=7)
-            }
-            jwt_token = jwt.encode(token_payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
-            user_dict = user.to_dict()
-            user_dict['token'] = jwt_token
-            user_dict['is_new_user'] = False
-            return jsonify(user_dict)
-        return jsonify({"error": "Authentication failed due to database conflict"}), 500
     except Exception as e:
         db.session.rollback()
         print(f"❌ Auth error: {e}")
@@ -1137,6 +1469,56 @@ def auth_with_telegram():
         return jsonify({"error": "Authentication failed"}), 500
 
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(last_id) -> str:
+    return base64.urlsafe_b64encode(f"c:{last_id}".encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor: str) -> int:
+    """Raises ValueError for anything encode_cursor could not have produced"""
+    raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+    if not raw.startswith('c:'):
+        raise ValueError("bad cursor")
+    return int(raw[2:])
+
+
+def get_page_args():
+    """
+    (after_id, limit) from ?cursor=&limit=. Feeds are always paged: limit defaults
+    to DEFAULT_PAGE_SIZE and is capped at MAX_PAGE_SIZE.
+    """
+    cursor = request.args.get('cursor')
+    limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
+    after_id = decode_cursor(cursor) if cursor else None
+    return after_id, max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def keyset_page(query, after_id, limit):
+    """Apply keyset pagination on user_campaigns.id; returns (campaigns, next_cursor)"""
+    if after_id is not None:
+        query = query.filter(UserCampaign.id > after_id)
+    query = query.order_by(UserCampaign.id)
+    if limit is None:
+        return query.all(), None
+
+    campaigns = query.limit(limit + 1).all()
+    if len(campaigns) <= limit:
+        return campaigns, None
+    campaigns = campaigns[:limit]
+    return campaigns, encode_cursor(campaigns[-1].id)
+
+
+def paginated_response(items: list, next_cursor):
+    """Same bare-array body as before; the cursor for the next page rides in X-Next-Cursor"""
+    response = jsonify(items)
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response, 200
+
+
 @app.route('/my-campaigns', methods=['GET'])
 @jwt_required  # Use this or  depending on your needs
 def get_my_created_campaigns():
@@ -1146,20 +1528,21 @@ def get_my_created_campaigns():
     if not user_id:
         return jsonify({"success": False, "message": "Missing user_id"}), 400
 
-    user = User.query.get(user_id)
+    user = get_request_user(user_id, columns=(User.id,))
     if not user:
         return jsonify({"success": False, "message": "User not found"}), 404
+    try:
+        after_id, limit = get_page_args()
+    except ValueError:
+        return jsonify({"success": False, "message": "Invalid cursor"}), 400
 
+    user_campaigns, next_cursor = keyset_page(
+        UserCampaign.query.filter_by(creator_id=user_id), after_id, limit
+    )
 
-    user_campaigns = UserCampaign.query.filter_by(creator_id=user_id).order_by(UserCampaign.id).all()
-    
-    if not user_campaigns:
-        return jsonify([]), 200
-        
-    
     campaigns_list = [campaign.to_dict() for campaign in user_campaigns]
     
-    return jsonify(campaigns_list), 200
+    return paginated_response(campaigns_list, next_cursor)
 
 
 @app.route('/my-partnercampaigns', methods=['GET'])
@@ -1173,15 +1556,161 @@ def get_my_partner_campaigns():
     if not user:
         return jsonify({"success": False, "message": "User not found"}), 404
 
+    try:
+        after_id, limit = get_page_args()
+    except ValueError:
+        return jsonify({"success": False, "message": "Invalid cursor"}), 400
+
     # Query only partner campaigns for this user
-    partner_campaigns = PartnerCampaign.query.filter_by(creator_id=user_id).order_by(PartnerCampaign.id).all()
-    
-    if not partner_campaigns:
-        return jsonify([]), 200
+    partner_campaigns, next_cursor = keyset_page(
+        PartnerCampaign.query.filter_by(creator_id=user_id), after_id, limit
+    )
         
     campaigns_list = [campaign.to_dict() for campaign in partner_campaigns]
     
-    return jsonify(campaigns_list), 200
+    return paginated_response(campaigns_list, next_cursor)
+
+def save_campaign_langs(campaign):
+    """Write the campaign_langs rows for a (flushed) campaign"""
+    langs = {lang for lang in (campaign.langs or []) if lang} or {ANY_LANGUAGE}
+    db.session.execute(campaign_langs.insert(), [
+        {"lang": lang, "campaign_id": campaign.id} for lang in sorted(langs)
+    ])
+
+
+# language -> open campaigns visible in that language, as serialized dicts.
+# Invalidated locally on create, claim-to-goal and reactivate; the TTL bounds
+# how stale other workers (and the completions counters) can get.
+CAMPAIGN_CATALOG = TTLCache(
+    maxsize=64,
+    ttl=int(os.getenv('CAMPAIGN_CATALOG_TTL', 30))
+)
+
+
+def invalidate_campaign_catalog():
+    CAMPAIGN_CATALOG.clear()
+
+
+def get_campaign_catalog(language: str) -> dict:
+    """
+    Open campaigns (completions < goal) for a language:
+    {"all": [campaign dict, ...] sorted by id, "by_category": {category name: [...]}}
+    """
+    catalog = CAMPAIGN_CATALOG.get(language)
+    if catalog is not None:
+        return catalog
+
+    campaign = with_polymorphic(UserCampaign, [PartnerCampaign])
+    visible_ids = select(campaign_langs.c.campaign_id).where(
+        campaign_langs.c.lang.in_([language, ANY_LANGUAGE])
+    )
+    campaigns = db.session.query(campaign).filter(
+        campaign.id.in_(visible_ids),
+        campaign.completions + campaign.pending_completions < campaign.goal
+    ).order_by(campaign.id).all()
+
+    catalog = {"all": [], "by_category": {}}
+    for c in campaigns:
+        data = c.to_dict()
+        catalog["all"].append(data)
+        catalog["by_category"].setdefault(data['category'], []).append(data)
+
+    CAMPAIGN_CATALOG.set(language, catalog)
+    return catalog
+
+
+ALL_CAMPAIGNS_KEY = '__all__'
+
+
+def get_all_campaigns() -> list:
+    """Every campaign regardless of language or goal, as serialized dicts sorted by id"""
+    campaigns = CAMPAIGN_CATALOG.get(ALL_CAMPAIGNS_KEY)
+    if campaigns is not None:
+        return campaigns
+
+    campaign = with_polymorphic(UserCampaign, [PartnerCampaign])
+    campaigns = [c.to_dict() for c in db.session.query(campaign).order_by(campaign.id)]
+
+    CAMPAIGN_CATALOG.set(ALL_CAMPAIGNS_KEY, campaigns)
+    return campaigns
+
+
+# user_id -> sorted array of completed campaign ids. Arrays are never mutated
+# in place; record_campaign_completion swaps in a new one so readers stay safe.
+COMPLETED_CAMPAIGNS = TTLCache(
+    maxsize=int(os.getenv('COMPLETED_CAMPAIGNS_CACHE_SIZE', 20000)),
+    ttl=int(os.getenv('COMPLETED_CAMPAIGNS_CACHE_TTL', 600))
+)
+
+
+def get_completed_campaign_ids(user_id: int) -> array:
+    completed = COMPLETED_CAMPAIGNS.get(user_id)
+    if completed is not None:
+        return completed
+
+    completed = array('q', db.session.execute(
+        select(user_task_completion.c.campaign_id).where(
+            (user_task_completion.c.user_id == user_id) &
+            (user_task_completion.c.completed_at.isnot(None))
+        ).order_by(user_task_completion.c.campaign_id)
+    ).scalars())
+
+    COMPLETED_CAMPAIGNS.set(user_id, completed)
+    return completed
+
+
+def record_campaign_completion(user_id: int, campaign_id: int):
+    """Add a freshly committed completion to the user's cached set, if it is cached"""
+    completed = COMPLETED_CAMPAIGNS.get(user_id)
+    if completed is None:
+        return
+
+    campaign_id = int(campaign_id)
+    index = bisect_left(completed, campaign_id)
+    if index < len(completed) and completed[index] == campaign_id:
+        return
+
+    updated = array('q', completed)
+    insort(updated, campaign_id)
+    COMPLETED_CAMPAIGNS.set(user_id, updated)
+
+
+def exclude_completed(campaigns, completed: array, limit=None) -> list:
+    """
+    Drop completed campaigns from an id-sorted sequence by walking both sorted
+    sequences, stopping once limit campaigns have been collected
+    """
+    remaining = []
+    i, n = 0, len(completed)
+    for campaign in campaigns:
+        # Partner campaigns serialize their id as a string
+        campaign_id = int(campaign['id'])
+        while i < n and completed[i] < campaign_id:
+            i += 1
+        if i < n and completed[i] == campaign_id:
+            continue
+        remaining.append(campaign)
+        if limit is not None and len(remaining) >= limit:
+            break
+    return remaining
+
+
+def cached_campaign_page(campaigns: list, completed: array):
+    """Keyset page over an id-sorted cached list minus completed ids; returns (page, next_cursor)"""
+    after_id, limit = get_page_args()
+    start = 0
+    if after_id is not None:
+        start = bisect_right(campaigns, after_id, key=lambda c: int(c['id']))
+
+    page = exclude_completed(
+        islice(campaigns, start, None), completed,
+        limit=limit + 1 if limit is not None else None
+    )
+    if limit is None or len(page) <= limit:
+        return page, None
+    page = page[:limit]
+    return page, encode_cursor(page[-1]['id'])
+
 
 # @app.route('/usercampaigns/unclaimed', methods=['GET'])
 # @jwt_required
@@ -1229,39 +1758,24 @@ def get_unclaimed_campaigns():
         if not user_id:
             return jsonify({"success": False, "message": "Missing user_id"}), 400
 
-        user = User.query.get(user_id)
+        user = get_request_user(user_id, columns=(User.id, User.language_code))
         if not user:
             return jsonify({"success": False, "message": "User not found"}), 404
 
         # Get the current user's language preference
-        current_user_obj = User.query.get(user_id)
-        user_language = current_user_obj.language_code if current_user_obj else 'en'
+        user_language = user.language_code or 'en'
 
-        # Single query using LEFT JOIN to exclude completed campaigns AND campaigns that reached goal
-        unclaimed_campaigns = db.session.query(UserCampaign).outerjoin(
-            user_task_completion,
-            (user_task_completion.c.campaign_id == UserCampaign.id) & 
-            (user_task_completion.c.user_id == user_id) &
-            (user_task_completion.c.completed_at.isnot(None))
-        ).filter(
-            user_task_completion.c.campaign_id.is_(None),  # No completed records exist
-            UserCampaign.completions < UserCampaign.goal   # Exclude campaigns that reached goal
-        ).all()
+        # Open campaigns in the user's language, optionally narrowed to one category
+        catalog = get_campaign_catalog(user_language)
+        category = request.args.get('category', type=str)
+        campaigns = catalog["by_category"].get(category.upper(), []) if category else catalog["all"]
 
-        # Filter campaigns by language
-        filtered_campaigns = []
-        for campaign in unclaimed_campaigns:
-            # If campaign has no language restrictions or user's language is included
-            if (not campaign.langs or 
-                campaign.langs == [] or 
-                campaign.langs == [''] or 
-                user_language in campaign.langs):
-                filtered_campaigns.append(campaign)
-        
-        # Sort by ID
-        filtered_campaigns.sort(key=lambda x: x.id)
+        try:
+            page, next_cursor = cached_campaign_page(campaigns, get_completed_campaign_ids(user_id))
+        except ValueError:
+            return jsonify({"success": False, "message": "Invalid cursor"}), 400
 
-        return jsonify([c.to_dict() for c in filtered_campaigns]), 200
+        return paginated_response(page, next_cursor)
 
     except Exception as e:
         print(f"Error fetching unclaimed campaigns: {e}")
@@ -1279,26 +1793,19 @@ def get_all_uncompleted_campaigns():
         if not current_user_id:
             return jsonify({"success": False, "message": "Missing user_id"}), 400
 
-        user = User.query.get(current_user_id)
+        user = get_request_user(current_user_id, columns=(User.id,))
         if not user:
             return jsonify({"success": False, "message": "User not found"}), 404
 
-
-        # Get all campaign IDs completed by this user
-        completed_records = db.session.execute(
-            user_task_completion.select().where(
-                (user_task_completion.c.user_id == current_user_id) &
-                (user_task_completion.c.completed_at.isnot(None))
-            )
-        ).all()
-        completed_campaign_ids = [record.campaign_id for record in completed_records]
-
         # Return all campaigns excluding the completed ones
-        campaigns = UserCampaign.query.filter(
-            ~UserCampaign.id.in_(completed_campaign_ids)
-        ).order_by(UserCampaign.id).all()
+        try:
+            page, next_cursor = cached_campaign_page(
+                get_all_campaigns(), get_completed_campaign_ids(current_user_id)
+            )
+        except ValueError:
+            return jsonify({"success": False, "message": "Invalid cursor"}), 400
 
-        return jsonify([c.to_dict() for c in campaigns]), 200
+        return paginated_response(page, next_cursor)
 
     except Exception as e:
         print(f"Error fetching campaigns: {e}")
@@ -1317,7 +1824,7 @@ def create_campaign():
     if not user_id:
         return jsonify({"success": False, "message": "User ID is required"}), 400
 
-    user = User.query.get(user_id)
+    user = get_request_user(user_id)
     if not user:
         return jsonify({"success": False, "message": "User not found"}), 404
 
@@ -1340,7 +1847,7 @@ def create_campaign():
         }), 400
 
     # Check creator exists
-    creator = User.query.get(data['user_id'])
+    creator = get_request_user(data['user_id'])
     if not creator:
         return jsonify({
             "success": False,
@@ -1401,7 +1908,10 @@ def create_campaign():
         )
 
     db.session.add(new_campaign)
+    db.session.flush()
+    save_campaign_langs(new_campaign)
     db.session.commit()
+    invalidate_campaign_catalog()
 
     return jsonify({
         "success": True,
@@ -1461,65 +1971,88 @@ def validate_bot_access(link):
 
 
 
+MAX_START_BATCH = 100
+
+
+def start_campaign_tasks(user_id: int, task_ids) -> dict:
+    """
+    Start every task in task_ids for the user with one INSERT ... SELECT ... ON
+    CONFLICT DO NOTHING plus one status read for the rows that already existed.
+    Returns {task_id: "new" | "started" | "completed" | "not_found"}.
+    """
+    task_ids = set(task_ids)
+    campaigns = UserCampaign.__table__
+
+    insert = dialect_insert(user_task_completion).from_select(
+        ["user_id", "campaign_id", "started_at"],
+        select(literal(user_id), campaigns.c.id, literal(datetime.now())).where(campaigns.c.id.in_(task_ids))
+    ).on_conflict_do_nothing(
+        index_elements=[user_task_completion.c.user_id, user_task_completion.c.campaign_id]
+    ).returning(user_task_completion.c.campaign_id)
+
+    results = {task_id: "new" for task_id in db.session.execute(insert).scalars()}
+
+    remaining = task_ids - results.keys()
+    if remaining:
+        existing = db.session.execute(
+            select(user_task_completion.c.campaign_id, user_task_completion.c.completed_at).where(
+                (user_task_completion.c.user_id == user_id) &
+                (user_task_completion.c.campaign_id.in_(remaining))
+            )
+        )
+        for campaign_id, completed_at in existing:
+            results[campaign_id] = "completed" if completed_at else "started"
+
+    for task_id in task_ids - results.keys():
+        results[task_id] = "not_found"
+    return results
+
+
 @app.route("/tasks/start", methods=["POST"])
 @jwt_required
 def start_task():
+    """
+    Start one task ({userId, taskId}) or a batch ({userId, taskIds: [...]}).
+    Batches answer {"success": true, "results": {taskId: status}}.
+    """
     data = request.get_json()
     user_id = data.get("userId")
     task_id = data.get("taskId")
+    task_ids = data.get("taskIds")
 
-    if not user_id or not task_id:
+    if not user_id or not (task_id or task_ids):
         return jsonify({"success": False, "message": "Missing parameters"}), 400
 
-    user = User.query.get(user_id)
-    campaign = UserCampaign.query.get(task_id)
-
-    if not user or not campaign:
-        return jsonify({"success": False, "message": "User or Campaign not found"}), 404
-
-    # Check if campaign is active
-   
-
-    # Check if user has Telegram connected
-    if not user.id:
+    if task_ids is not None and (not isinstance(task_ids, list) or len(task_ids) > MAX_START_BATCH):
         return jsonify({
-            "success": False, 
-            "message": "Please connect your Telegram account first"
+            "success": False,
+            "message": f"taskIds must be a list of at most {MAX_START_BATCH} ids"
         }), 400
 
-    # Check if already completed
-    existing_completion = db.session.execute(
-        user_task_completion.select().where(
-            (user_task_completion.c.user_id == user_id) &
-            (user_task_completion.c.campaign_id == str(task_id)) &
-            (user_task_completion.c.completed_at.isnot(None))
-        )
-    ).first()
+    try:
+        requested = [int(t) for t in task_ids] if task_ids is not None else [int(task_id)]
+    except (TypeError, ValueError):
+        return jsonify({"success": False, "message": "Invalid task id"}), 400
 
-    if existing_completion:
-        return jsonify({"success": False, "message": "Task already completed"}), 400
+    user = get_request_user(user_id, columns=(User.id,))
+    if not user:
+        return jsonify({"success": False, "message": "User not found"}), 404
 
-    # Check if already started but not completed
-    existing_start = db.session.execute(
-        user_task_completion.select().where(
-            (user_task_completion.c.user_id == user_id) &
-            (user_task_completion.c.campaign_id == (task_id)) &
-            (user_task_completion.c.completed_at.is_(None))
-        )
-    ).first()
+    # NO VALIDATION AT START - JUST CREATE THE TASK RECORDS
+    results = start_campaign_tasks(user.id, requested)
+    db.session.commit()
 
-    if existing_start:
-        return jsonify({"success": True, "message": "Task already started", "status": "started"})
+    if task_ids is not None:
+        return jsonify({"success": True, "results": results})
 
-    # NO VALIDATION AT START - JUST CREATE THE TASK RECORD
-    db.session.execute(user_task_completion.insert().values(
-        user_id=user_id,
-        campaign_id=(task_id),
-        started_at=datetime.now()
-    ))
+    status = results[requested[0]]
+    if status == "not_found":
+        return jsonify({"success": False, "message": "User or Campaign not found"}), 404
+    if status == "completed":
+        return jsonify({"success": False, "message": "Task already completed"}), 400
+    if status == "started":
+        return jsonify({"success": True, "message": "Task already started", "status": "started"})
 
-    db.session.commit()
-    
     return jsonify({
         "success": True, 
         "message": "Task started successfully", 
@@ -1527,6 +2060,123 @@ def start_task():
     })
 
 
+# Claims this close to a campaign's goal skip the shards and take the exact path
+COMPLETION_EXACT_MARGIN = max(1, int(os.getenv('COMPLETION_EXACT_MARGIN', 50)))
+
+
+def increment_completion_shard(counter: str, task_id: int, user_id: int):
+    """Add one completion to the shard row picked by the claimer's id"""
+    stmt = dialect_insert(completion_shards).values(
+        counter=counter, task_id=task_id, shard=user_id % COMPLETION_SHARDS, count=1
+    )
+    db.session.execute(stmt.on_conflict_do_update(
+        index_elements=[completion_shards.c.counter, completion_shards.c.task_id, completion_shards.c.shard],
+        set_={"count": completion_shards.c.count + 1}
+    ))
+
+
+def reset_completion_shards(counter: str, task_id: int):
+    db.session.execute(completion_shards.delete().where(
+        (completion_shards.c.counter == counter) & (completion_shards.c.task_id == task_id)
+    ))
+
+
+def take_campaign_slot(campaign, user_id: int):
+    """
+    Count one completion for campaign and return the new total, or None when the
+    campaign is already full.
+
+    Far from the goal (judged from the unlocked read of campaign) the claim only
+    bumps its own shard row, then re-reads the exact total. If that lands within
+    COMPLETION_EXACT_MARGIN of the goal, a burst may have overtaken the stale read,
+    so the claim settles under the campaign row lock: past the goal it gives its
+    slot back, at the goal it closes the campaign. Claims that start within the
+    margin run one conditional UPDATE ... RETURNING on the campaign row that also
+    counts the unfolded shards, so the last slots cannot be oversold and the
+    campaign is closed as soon as it fills up.
+    """
+    campaigns = UserCampaign.__table__
+    pending = select(func.coalesce(func.sum(completion_shards.c.count), 0)).where(
+        (completion_shards.c.counter == CAMPAIGN_COUNTER) &
+        (completion_shards.c.task_id == campaigns.c.id)
+    ).scalar_subquery()
+    total = campaigns.c.completions + pending
+    completed = literal(CampaignStatus.COMPLETED, campaigns.c.status.type)
+
+    remaining = campaign.goal - campaign.total_completions
+    if remaining > COMPLETION_EXACT_MARGIN:
+        increment_completion_shard(CAMPAIGN_COUNTER, campaign.id, user_id)
+        count = db.session.execute(select(total).where(campaigns.c.id == campaign.id)).scalar()
+        if campaign.goal - count > COMPLETION_EXACT_MARGIN:
+            return count
+
+        # Serialise the claims near the goal on the campaign row, then count again
+        count = db.session.execute(
+            select(total).where(campaigns.c.id == campaign.id).with_for_update(of=campaigns)
+        ).scalar()
+        if count > campaign.goal:
+            db.session.execute(completion_shards.update().where(
+                (completion_shards.c.counter == CAMPAIGN_COUNTER) &
+                (completion_shards.c.task_id == campaign.id) &
+                (completion_shards.c.shard == user_id % COMPLETION_SHARDS)
+            ).values(count=completion_shards.c.count - 1))
+            return None
+        if count == campaign.goal:
+            db.session.execute(
+                campaigns.update().where(campaigns.c.id == campaign.id).values(status=completed)
+            )
+        return count
+
+    return db.session.execute(
+        campaigns.update()
+        .where((campaigns.c.id == campaign.id) & (total < campaigns.c.goal))
+        .values(
+            completions=campaigns.c.completions + 1,
+            status=case((total + 1 >= campaigns.c.goal, completed), else_=campaigns.c.status)
+        )
+        .returning(total)
+    ).scalar()
+
+
+def fold_completion_shards(batch_size: int = 500) -> int:
+    """Move shard tallies into the parent completions columns; returns the shard rows folded"""
+    parents = {
+        CAMPAIGN_COUNTER: UserCampaign.__table__,
+        DAILY_TASK_COUNTER: DailyTask.__table__,
+    }
+    folded = 0
+    while True:
+        rows = db.session.execute(
+            select(completion_shards).where(completion_shards.c.count > 0).limit(batch_size)
+        ).all()
+        if not rows:
+            return folded
+
+        for row in rows:
+            # Subtract exactly what was read so claims landing meanwhile are kept
+            db.session.execute(completion_shards.update().where(
+                (completion_shards.c.counter == row.counter) &
+                (completion_shards.c.task_id == row.task_id) &
+                (completion_shards.c.shard == row.shard)
+            ).values(count=completion_shards.c.count - row.count))
+
+            parent = parents[row.counter]
+            db.session.execute(parent.update().where(parent.c.id == row.task_id).values(
+                completions=func.coalesce(parent.c.completions, 0) + row.count
+            ))
+
+        db.session.commit()
+        folded += len(rows)
+
+
+@app.cli.command("fold-completion-shards")
+@with_appcontext
+def fold_completion_shards_command():
+    """Fold sharded completion counters back into their tasks (run from cron)"""
+    folded = fold_completion_shards()
+    click.echo(f"✅ Folded {folded} completion shards")
+
+
 @app.route("/tasks/claim", methods=["POST"])
 @jwt_required
 def claim_task():
@@ -1537,7 +2187,7 @@ def claim_task():
     if not user_id or not task_id:
         return jsonify({"success": False, "message": "Missing parameters"}), 400
 
-    user = User.query.get(user_id)
+    user = get_request_user(user_id)
     campaign = UserCampaign.query.get(task_id)
 
     if not user or not campaign:
@@ -1557,14 +2207,25 @@ def claim_task():
     if existing_record.completed_at:
         return jsonify({"success": False, "message": "Task already claimed"}), 400
 
+    # Fail fast before any Telegram round trips; take_campaign_slot re-checks
+    if campaign.total_completions >= campaign.goal:
+        return jsonify({"success": False, "message": "Campaign has reached its goal"}), 400
+
     # VALIDATION: Check subscription for social campaigns (ONLY AT CLAIM TIME)
     if campaign.category == TaskCategory.SOCIAL and campaign.check_subscription:
         # Extract channel username from link (e.g., "https://t.me/channelname" -> "channelname")
         channel_username = campaign.link.replace('https://t.me/', '').split('?')[0]
         
         # Make direct Telegram API request to check membership
-        is_member = check_telegram_membership_direct(channel_username, user.id)
+        is_member = check_telegram_membership_direct(channel_username, user.id, Deadline(VERIFICATION_DEADLINE))
         
+        if is_member is None:
+            queue_pending_claim(user.id, campaign.id)
+            return jsonify({
+                "success": False,
+                "pending": True,
+                "message": "We're verifying your subscription, your reward will be credited shortly"
+            }), 202
         if not is_member:
             return jsonify({
                 "success": False, 
@@ -1619,16 +2280,34 @@ def claim_task():
                 "message": "Level completion not verified. Please make sure the game sent your progress."
             }), 400
 
-    # ONLY COMPLETE TASK IF VALIDATION PASSES
-    db.session.execute(
+    reward, error = complete_campaign_task(user, campaign)
+    if error:
+        return jsonify({"success": False, "message": error}), 400
+
+    return jsonify({
+        "success": True,
+        "message": f"Task claimed! +{reward} coins",
+        **user_payload(user),
+        "reward": reward
+    })
+
+
+def complete_campaign_task(user, campaign):
+    """
+    Mark a started task claimed, pay the reward and take a campaign slot, then commit.
+    Returns (reward, None), or (None, error message) after rolling back.
+    """
+    # completed_at IS NULL makes a concurrent double claim match zero rows
+    claimed = db.session.execute(
         user_task_completion.update().where(
-            (user_task_completion.c.user_id == user_id) &
-            (user_task_completion.c.campaign_id == (task_id))
+            (user_task_completion.c.user_id == user.id) &
+            (user_task_completion.c.campaign_id == campaign.id) &
+            (user_task_completion.c.completed_at.is_(None))
         ).values(completed_at=datetime.now())
-    )
-
-    # Update campaign completions
-    campaign.completions += 1
+    ).rowcount
+    if not claimed:
+        db.session.rollback()
+        return None, "Task already claimed"
 
     # Reward user
     CONVERSION_RATE = 1000000
@@ -1650,15 +2329,117 @@ def claim_task():
 
     award_referral_earnings(user.id, reward)
 
-    db.session.commit()
-    db.session.refresh(user)
+    # Taken last so the hot campaign row stays locked only until the commit below
+    completions = take_campaign_slot(campaign, user.id)
+    if completions is None:
+        db.session.rollback()
+        return None, "Campaign has reached its goal"
+
+    db.session.commit()
+
+    record_campaign_completion(user.id, campaign.id)
+    if completions >= campaign.goal:
+        invalidate_campaign_catalog()
+    return reward, None
+
+
+PENDING_CLAIM_BATCH = int(os.getenv('PENDING_CLAIM_BATCH', 100))
+PENDING_CLAIM_MAX_ATTEMPTS = int(os.getenv('PENDING_CLAIM_MAX_ATTEMPTS', 20))
+
+
+def queue_pending_claim(user_id: int, campaign_id: int):
+    """Park a claim whose subscription could not be checked yet"""
+    db.session.execute(
+        dialect_insert(pending_claims)
+        .values(user_id=user_id, campaign_id=campaign_id, queued_at=datetime.utcnow())
+        .on_conflict_do_nothing(index_elements=['user_id', 'campaign_id'])
+    )
+    db.session.commit()
+
+
+def process_pending_claims(limit: int = PENDING_CLAIM_BATCH) -> dict:
+    """
+    Re-check queued claims, oldest first, and complete the ones that verify.
+    Stops early while Telegram's breaker is open; claims that still can't be checked
+    after PENDING_CLAIM_MAX_ATTEMPTS tries are dropped so the user can claim again.
+    """
+    counts = {'completed': 0, 'rejected': 0, 'deferred': 0, 'dropped': 0}
+    telegram_breaker = verification_engine.breakers['telegram']
+    queued = db.session.execute(
+        select(pending_claims).order_by(pending_claims.c.queued_at).limit(limit)
+    ).all()
+
+    for row in queued:
+        if telegram_breaker.is_open:
+            break
+        key = (pending_claims.c.user_id == row.user_id) & (pending_claims.c.campaign_id == row.campaign_id)
+        user = db.session.get(User, row.user_id)
+        campaign = db.session.get(UserCampaign, row.campaign_id)
+        if not user or not campaign:
+            db.session.execute(pending_claims.delete().where(key))
+            db.session.commit()
+            counts['dropped'] += 1
+            continue
+
+        channel_username = campaign.link.replace('https://t.me/', '').split('?')[0]
+        is_member = check_telegram_membership_direct(channel_username, user.id, Deadline(VERIFICATION_DEADLINE))
+        if is_member is None:
+            if row.attempts + 1 >= PENDING_CLAIM_MAX_ATTEMPTS:
+                db.session.execute(pending_claims.delete().where(key))
+                counts['dropped'] += 1
+            else:
+                db.session.execute(pending_claims.update().where(key).values(attempts=pending_claims.c.attempts + 1))
+                counts['deferred'] += 1
+            db.session.commit()
+            continue
+
+        # Deleted in the same transaction as the payout
+        db.session.execute(pending_claims.delete().where(key))
+        if not is_member:
+            db.session.commit()
+            counts['rejected'] += 1
+            continue
+
+        reward, error = complete_campaign_task(user, campaign)
+        if error:
+            db.session.execute(pending_claims.delete().where(key))
+            db.session.commit()
+            counts['rejected'] += 1
+        else:
+            counts['completed'] += 1
+    return counts
+
+
+@app.cli.command("process-pending-claims")
+@click.option("--limit", default=PENDING_CLAIM_BATCH, show_default=True)
+@with_appcontext
+def process_pending_claims_command(limit):
+    """Verify and complete claims queued while Telegram was unavailable"""
+    counts = process_pending_claims(limit)
+    click.echo(f"✅ Pending claims: {counts}")
+
+
+def run_pending_claims_worker(interval: int):
+    while True:
+        time.sleep(interval)
+        with app.app_context():
+            try:
+                counts = process_pending_claims()
+                if counts['completed'] or counts['rejected'] or counts['dropped']:
+                    print(f"⏳ Processed pending claims: {counts}")
+            except Exception as e:
+                db.session.rollback()
+                print(f"Pending claim processing failed: {e}")
+
 
-    return jsonify({
-        "success": True,
-        "message": f"Task claimed! +{reward} coins",
-        "user": user.to_dict(),
-        "reward": reward
-    })
+# Optional in-process schedule (seconds); leave unset when cron runs the CLI command
+PENDING_CLAIM_INTERVAL = int(os.getenv('PENDING_CLAIM_INTERVAL', 0))
+if PENDING_CLAIM_INTERVAL > 0:
+    threading.Thread(
+        target=run_pending_claims_worker,
+        args=(PENDING_CLAIM_INTERVAL,),
+        daemon=True
+    ).start()
 
 def update_quest_progress(user_id: int, task_category: str):
     """Update quest progress based on completed task category"""
@@ -1675,6 +2456,7 @@ def update_quest_progress(user_id: int, task_category: str):
     
     # Get all active quests of this type
     quests = Quest.query.filter_by(quest_type=quest_type, is_active=True).all()
+    user = get_request_user(user_id)
     
     for quest in quests:
         # Get or create user progress record
@@ -1685,7 +2467,6 @@ def update_quest_progress(user_id: int, task_category: str):
         
         if not progress:
             # Calculate current progress from user stats
-            user = User.query.get(user_id)
             current_progress = 0
             
             if quest_type == 'game':
@@ -1704,11 +2485,11 @@ def update_quest_progress(user_id: int, task_category: str):
         else:
             # Update progress based on quest type
             if quest_type == 'game':
-                progress.current_progress = User.query.get(user_id).total_game_tasks_completed
+                progress.current_progress = user.total_game_tasks_completed
             elif quest_type == 'social':
-                progress.current_progress = User.query.get(user_id).total_social_tasks_completed
+                progress.current_progress = user.total_social_tasks_completed
             elif quest_type == 'partner':
-                progress.current_progress = User.query.get(user_id).total_partner_tasks_completed
+                progress.current_progress = user.total_partner_tasks_completed
         
         # Update completion status
         progress.is_completed = progress.current_progress >= quest.total_progress
@@ -1726,70 +2507,457 @@ def extract_game_id_from_link(link: str) -> str:
         # Return as is (could be bot username without @)
         return link
 
-def check_telegram_membership_direct(channel_username: str, user_telegram_id: int) -> bool:
-    """Make direct Telegram API request to check if user is member of channel"""
-    import requests
-    import os
-    
-    bot_token = os.getenv('TELEGRAM_BOT_TOKEN')
-    if not bot_token:
-        print("Telegram bot token not found")
-        return False
-    
-    base_url = f"https://api.telegram.org/bot{bot_token}"
+# (channel, user id) -> is member. Members are remembered longer than non-members
+# so someone who just subscribed can retry their claim without a long wait.
+MEMBERSHIP_CACHE = TTLCache(maxsize=int(os.getenv('MEMBERSHIP_CACHE_SIZE', 100000)))
+MEMBERSHIP_POSITIVE_TTL = int(os.getenv('MEMBERSHIP_POSITIVE_TTL', 600))
+MEMBERSHIP_NEGATIVE_TTL = int(os.getenv('MEMBERSHIP_NEGATIVE_TTL', 15))
+
+# channel -> the chat_id format ("@name" or "name") getChatMember accepted last time
+CHAT_ID_FORMATS = TTLCache(maxsize=10000)
+
+
+# Time budget for all outbound calls made while serving one claim; past it (or while
+# Telegram's breaker is open) the claim is queued for verification instead
+VERIFICATION_DEADLINE = float(os.getenv('VERIFICATION_DEADLINE', 5))
+
+
+def is_member_status(status: str) -> bool:
+    # User is member if status is not 'left' or 'kicked'
+    return status not in ['left', 'kicked']
+
+
+def stored_channel_membership(channel_key: str, user_telegram_id: int) -> Optional[bool]:
+    """Membership from ingested chat_member updates, or None if the table has no row"""
+    status = db.session.execute(
+        select(channel_memberships.c.status).where(
+            (channel_memberships.c.chat_id == channel_key) &
+            (channel_memberships.c.user_id == user_telegram_id)
+        )
+    ).scalar()
+    return is_member_status(status) if status is not None else None
+
+
+def check_telegram_membership_direct(channel_username: str, user_telegram_id: int,
+                                     deadline: Optional[Deadline] = None) -> Optional[bool]:
+    """
+    Check whether user is member of channel.
+    Answers from ingested chat_member updates when there are any, otherwise asks
+    getChatMember on the verification engine within deadline; returns None if
+    Telegram gave no answer in time or its breaker is open.
+    """
+    channel_key = channel_username.lower()
+    cached = MEMBERSHIP_CACHE.get((channel_key, user_telegram_id))
+    if cached is not None:
+        return cached
+
+    stored = stored_channel_membership(channel_key, user_telegram_id)
+    if stored is not None:
+        return stored
     
-    # Try different chat ID formats
+    # Try different chat ID formats, starting with the one that worked before
     chat_formats = [
         f"@{channel_username}",  # With @ prefix
         channel_username,         # Without @ prefix
     ]
+    known_format = CHAT_ID_FORMATS.get(channel_key)
+    if known_format in chat_formats:
+        chat_formats.remove(known_format)
+        chat_formats.insert(0, known_format)
     
-    for chat_format in chat_formats:
-        try:
-            url = f"{base_url}/getChatMember"
-            payload = {
-                "chat_id": chat_format,
-                "user_id": user_telegram_id
-            }
-            
-            response = requests.post(url, json=payload, timeout=10)
-            response.raise_for_status()
-            result = response.json()
-            
-            if result and result.get('ok'):
-                status = result['result']['status']
-                # User is member if status is not 'left' or 'kicked'
-                is_member = status not in ['left', 'kicked']
-                print(f"Telegram API: User {user_telegram_id} status in {chat_format}: {status} -> Member: {is_member}")
-                return is_member
-            else:
-                print(f"Telegram API error for {chat_format}: {result}")
-                
-        except requests.exceptions.HTTPError as e:
-            if e.response.status_code == 400:
-                error_data = e.response.json()
-                print(f"Telegram API 400 error for {chat_format}: {error_data.get('description', 'Unknown error')}")
-            else:
-                print(f"Telegram API HTTP error for {chat_format}: {e}")
-        except Exception as e:
-            print(f"Telegram API error for {chat_format}: {e}")
-    
-    return False
+    try:
+        deadline = deadline or Deadline(VERIFICATION_DEADLINE)
+        status, chat_format = verification_engine.run(
+            verification_engine.chat_member_status(chat_formats, user_telegram_id, deadline),
+            deadline,
+            upstream='telegram'
+        )
+    except (VerificationTimeout, UpstreamError, CircuitOpen) as e:
+        print(f"Telegram API: membership check for {user_telegram_id} in {channel_username} deferred: {e!r}")
+        return None
+    except Exception as e:
+        print(f"Telegram API error for {channel_username}: {e}")
+        return False
+
+    if status is None:
+        return False
+
+    is_member = is_member_status(status)
+    print(f"Telegram API: User {user_telegram_id} status in {chat_format}: {status} -> Member: {is_member}")
+
+    # Only definite answers are cached; errors fall through uncached
+    CHAT_ID_FORMATS.set(channel_key, chat_format)
+    MEMBERSHIP_CACHE.set(
+        (channel_key, user_telegram_id), is_member,
+        ttl=MEMBERSHIP_POSITIVE_TTL if is_member else MEMBERSHIP_NEGATIVE_TTL
+    )
+    return is_member
+
+
+TELEGRAM_WEBHOOK_SECRET = os.getenv('TELEGRAM_WEBHOOK_SECRET')
+
+
+def ingest_chat_member_updates(updates) -> int:
+    """
+    Upsert the membership changes carried by a batch of Telegram updates in one statement.
+    Older updates never overwrite newer ones, so redelivered or reordered updates are harmless.
+    Returns the number of distinct (chat, user) pairs in the batch.
+    """
+    rows = {}
+    for update in updates:
+        change = update.get('chat_member') or update.get('my_chat_member')
+        if not change:
+            continue
+
+        chat = change.get('chat') or {}
+        member = change.get('new_chat_member') or {}
+        user_id = (member.get('user') or {}).get('id')
+        status = member.get('status')
+        if not user_id or not status or not (chat.get('username') or chat.get('id')):
+            continue
+
+        # A restricted user may or may not still be in the chat
+        if status == 'restricted' and not member.get('is_member', True):
+            status = 'left'
+
+        chat_key = str(chat.get('username') or chat['id']).lower()
+        updated_at = datetime.utcfromtimestamp(change.get('date') or time.time())
+        key = (chat_key, user_id)
+        if key not in rows or rows[key]['updated_at'] <= updated_at:
+            rows[key] = {'chat_id': chat_key, 'user_id': user_id, 'status': status, 'updated_at': updated_at}
+
+    if not rows:
+        return 0
+
+    stmt = dialect_insert(channel_memberships)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['chat_id', 'user_id'],
+        set_={'status': stmt.excluded.status, 'updated_at': stmt.excluded.updated_at},
+        where=channel_memberships.c.updated_at <= stmt.excluded.updated_at
+    )
+    db.session.execute(stmt, list(rows.values()))
+    db.session.commit()
+
+    for key in rows:
+        MEMBERSHIP_CACHE.pop(key)
+    return len(rows)
+
+
+@app.route("/api/telegram/updates", methods=["POST"])
+def telegram_updates_webhook():
+    """
+    Bot webhook for chat_member / my_chat_member updates (register it with
+    allowed_updates including both). Accepts a single Update or a list of them.
+    """
+    secret = request.headers.get('X-Telegram-Bot-Api-Secret-Token', '')
+    if not TELEGRAM_WEBHOOK_SECRET or not hmac.compare_digest(secret, TELEGRAM_WEBHOOK_SECRET):
+        return jsonify({"success": False, "message": "Invalid secret token"}), 401
+
+    data = request.get_json(silent=True)
+    updates = data if isinstance(data, list) else [data] if isinstance(data, dict) else []
+
+    try:
+        ingested = ingest_chat_member_updates(updates)
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error ingesting chat member updates: {e}")
+        return jsonify({"success": False, "message": "Failed to ingest updates"}), 500
+
+    return jsonify({"success": True, "ingested": ingested})
+
+
+# Every stored (bot, user) start is in this worker's Bloom filter, so a filter miss
+# means "not started" without touching the database. The filter is loaded from
+# bot_starts in the background and then re-synced from recorded_at at most every
+# BOT_START_SYNC_INTERVAL seconds, so starts ingested by other workers show up too.
+# A filter hit can be a false positive and is only trusted after the LRU or a
+# primary key lookup confirms it.
+BOT_START_BLOOM = BloomFilter(
+    capacity=int(os.getenv('BOT_START_BLOOM_CAPACITY', 1000000)),
+    error_rate=float(os.getenv('BOT_START_BLOOM_ERROR_RATE', 0.001))
+)
+BOT_START_CACHE = TTLCache(maxsize=int(os.getenv('BOT_START_CACHE_SIZE', 100000)))
+BOT_START_BATCH = int(os.getenv('BOT_START_BATCH', 5000))
+BOT_START_SYNC_INTERVAL = float(os.getenv('BOT_START_SYNC_INTERVAL', 2))
+# Re-read this much recorded_at history on every sync to cover clock skew between
+# workers and transactions that committed late
+BOT_START_SYNC_OVERLAP = timedelta(seconds=int(os.getenv('BOT_START_SYNC_OVERLAP', 60)))
+# bot -> whether any start has been stored for it. Only bots with a start feed (a partner
+# webhook or a CSV import) can be verified; GAME campaigns for other bots keep passing.
+BOT_START_TRACKED_BOTS = TTLCache(maxsize=10000, ttl=600)
+BOT_START_UNTRACKED_TTL = 60
+_bot_start_warmup_lock = threading.Lock()
+_bot_start_warmup_started = False
+_bot_start_sync_lock = threading.Lock()
+# Set once the filter holds every stored start; None while it is still loading
+_bot_start_sync = {'watermark': None, 'synced_at': 0.0}
+
+
+def normalize_bot_username(bot_username: str) -> str:
+    return bot_username.strip().lstrip('@').lower()
+
+
+def bot_start_key(bot_username: str, user_id: int) -> str:
+    return f"{bot_username}:{user_id}"
+
+
+def warm_bot_start_filter():
+    """Load every stored start into the Bloom filter"""
+    with app.app_context():
+        watermark = datetime.utcnow() - BOT_START_SYNC_OVERLAP
+        rows = db.session.execute(
+            select(bot_starts.c.bot_username, bot_starts.c.user_id)
+            .execution_options(yield_per=BOT_START_BATCH)
+        )
+        loaded = 0
+        for bot_username, user_id in rows:
+            BOT_START_BLOOM.add(bot_start_key(bot_username, user_id))
+            loaded += 1
+        with _bot_start_sync_lock:
+            _bot_start_sync.update(watermark=watermark, synced_at=time.monotonic())
+        print(f"✅ Loaded {loaded} bot starts into the filter")
+
+
+def ensure_bot_start_filter_warm():
+    """Start warming the filter in the background on first use; lookups stay correct meanwhile"""
+    global _bot_start_warmup_started
+    with _bot_start_warmup_lock:
+        if _bot_start_warmup_started:
+            return
+        _bot_start_warmup_started = True
+    threading.Thread(target=warm_bot_start_filter, daemon=True).start()
+
+
+def bot_start_filter_current() -> bool:
+    """
+    True if the filter holds every start stored up to BOT_START_SYNC_INTERVAL ago,
+    syncing recently recorded starts first when it is due. False while warming up
+    or while another thread is syncing; callers then fall back to the table.
+    """
+    ensure_bot_start_filter_warm()
+    if not _bot_start_sync_lock.acquire(blocking=False):
+        return False
+    try:
+        watermark = _bot_start_sync['watermark']
+        if watermark is None:
+            return False
+        if time.monotonic() - _bot_start_sync['synced_at'] < BOT_START_SYNC_INTERVAL:
+            return True
+
+        next_watermark = datetime.utcnow() - BOT_START_SYNC_OVERLAP
+        rows = db.session.execute(
+            select(bot_starts.c.bot_username, bot_starts.c.user_id)
+            .where(bot_starts.c.recorded_at > watermark)
+        )
+        for bot_username, user_id in rows:
+            BOT_START_BLOOM.add(bot_start_key(bot_username, user_id))
+        _bot_start_sync.update(watermark=next_watermark, synced_at=time.monotonic())
+        return True
+    finally:
+        _bot_start_sync_lock.release()
+
+
+def record_bot_starts(events) -> int:
+    """
+    Store (bot_username, user_id, started_at) start events in bulk, BOT_START_BATCH rows
+    per statement. Repeat starts are ignored, so the first one recorded is kept.
+    Returns the number of distinct (bot, user) pairs in the events.
+    """
+    recorded_at = datetime.utcnow()
+    rows = {}
+    for bot_username, user_id, started_at in events:
+        rows.setdefault((bot_username, user_id), {
+            'bot_username': bot_username, 'user_id': user_id,
+            'started_at': started_at, 'recorded_at': recorded_at
+        })
+    if not rows:
+        return 0
+
+    values = list(rows.values())
+    for start in range(0, len(values), BOT_START_BATCH):
+        stmt = dialect_insert(bot_starts).on_conflict_do_nothing(index_elements=['bot_username', 'user_id'])
+        db.session.execute(stmt, values[start:start + BOT_START_BATCH])
+    db.session.commit()
+
+    for bot_username, user_id in rows:
+        BOT_START_BLOOM.add(bot_start_key(bot_username, user_id))
+        BOT_START_TRACKED_BOTS.set(bot_username, True)
+    return len(rows)
+
+
+def bot_starts_tracked(bot_username: str) -> bool:
+    """Whether starts are being reported for this bot at all"""
+    tracked = BOT_START_TRACKED_BOTS.get(bot_username)
+    if tracked is None:
+        tracked = db.session.execute(
+            select(literal(1)).where(bot_starts.c.bot_username == bot_username).limit(1)
+        ).first() is not None
+        BOT_START_TRACKED_BOTS.set(bot_username, tracked, ttl=None if tracked else BOT_START_UNTRACKED_TTL)
+    return tracked
 
 
 def check_user_started_bot(bot_username: str, user_telegram_id: int) -> bool:
     """
-    Check if user started the bot.
-    This requires storing bot start events in your database.
-    For now, return True as placeholder - implement your actual tracking logic.
+    Check if user started the bot, from start events reported by the bot's owner.
+    Bots nobody reports starts for can't be verified and are let through as before.
     """
-    # TODO: Implement actual bot start tracking
-    # This could be done by storing when users interact with your bot
-    # and checking if the user has started the specific bot
-    
-    print(f"Placeholder: Assuming user {user_telegram_id} started bot {bot_username}")
-    return True
+    bot_username = normalize_bot_username(bot_username)
+    if not bot_starts_tracked(bot_username):
+        print(f"No start feed for bot {bot_username}; assuming user {user_telegram_id} started it")
+        return True
+    key = bot_start_key(bot_username, user_telegram_id)
+
+    if BOT_START_CACHE.get(key):
+        return True
+    # A Bloom filter has no false negatives, so a miss is a definite "not started"
+    if bot_start_filter_current() and not BOT_START_BLOOM.might_contain(key):
+        return False
+
+    started = db.session.execute(
+        select(literal(1)).where(
+            (bot_starts.c.bot_username == bot_username) &
+            (bot_starts.c.user_id == user_telegram_id)
+        )
+    ).first() is not None
+    if started:
+        BOT_START_CACHE.set(key, True)
+    return started
+
+
+@app.route("/api/webhook/bot-start", methods=["POST"])
+def bot_start_webhook():
+    """
+    Partner bots report /start events here, authenticated with their campaign's webhook token.
+    Body: {"user_id": 123, "started_at": <unix time>} or {"events": [{...}, ...]}
+    """
+    auth_token = request.headers.get('Authorization')
+    if not auth_token or not auth_token.startswith('Bearer '):
+        return jsonify({"success": False, "message": "Authentication required"}), 401
+
+    campaign = partner_campaign_for_token(auth_token[7:])
+    if not campaign:
+        return jsonify({"success": False, "message": "Invalid token"}), 401
+    bot_username = normalize_bot_username(extract_game_id_from_link(campaign['link']))
+
+    data = request.get_json(silent=True) or {}
+    events = data.get('events') if 'events' in data else [data]
+    if not isinstance(events, list) or not events:
+        return jsonify({"success": False, "message": "No events"}), 400
+    if len(events) > BOT_START_BATCH:
+        return jsonify({"success": False, "message": f"At most {BOT_START_BATCH} events per request"}), 400
+
+    try:
+        starts = [
+            (bot_username, int(event['user_id']),
+             datetime.utcfromtimestamp(event['started_at']) if event.get('started_at') else datetime.utcnow())
+            for event in events
+        ]
+    except (KeyError, TypeError, ValueError, OverflowError):
+        return jsonify({"success": False, "message": "Each event needs a numeric user_id"}), 400
+
+    try:
+        recorded = record_bot_starts(starts)
+    except Exception as e:
+        db.session.rollback()
+        print(f"Error recording bot starts for {bot_username}: {e}")
+        return jsonify({"success": False, "message": "Failed to record events"}), 500
+
+    return jsonify({"success": True, "recorded": recorded})
+
+
+@app.cli.command("import-bot-starts")
+@click.argument("path", type=click.Path(exists=True, dir_okay=False))
+@click.option("--bot", "bot_username", default=None, help="Bot for every row, when the CSV has no bot_username column")
+@with_appcontext
+def import_bot_starts_command(path, bot_username):
+    """Backfill bot starts from a CSV with user_id and optional bot_username / started_at (ISO) columns"""
+    imported = 0
+    batch = []
+    with open(path, newline='') as f:
+        for row in csv.DictReader(f):
+            bot = normalize_bot_username(bot_username or row['bot_username'])
+            started_at = datetime.fromisoformat(row['started_at']) if row.get('started_at') else datetime.utcnow()
+            batch.append((bot, int(row['user_id']), started_at))
+            if len(batch) >= BOT_START_BATCH:
+                imported += record_bot_starts(batch)
+                batch = []
+    imported += record_bot_starts(batch)
+    click.echo(f"✅ Imported {imported} bot starts")
+
+
+# webhook token -> the partner campaign fields webhooks need, so high-volume partner
+# calls don't look up their campaign on every request
+PARTNER_WEBHOOK_TOKENS = TTLCache(maxsize=1000, ttl=300)
+LEVEL_UPDATE_BATCH_LIMIT = int(os.getenv('LEVEL_UPDATE_BATCH_LIMIT', 1000))
+
+
+def partner_campaign_for_token(token: str) -> Optional[dict]:
+    campaign = PARTNER_WEBHOOK_TOKENS.get(token)
+    if campaign is None:
+        partner_campaign = PartnerCampaign.query.filter_by(webhook_token=token).first()
+        if not partner_campaign:
+            return None
+        campaign = {
+            'id': partner_campaign.id,
+            'link': partner_campaign.link,
+            'required_level': partner_campaign.required_level
+        }
+        PARTNER_WEBHOOK_TOKENS.set(token, campaign)
+    return campaign
+
+
+def apply_level_updates(campaign: dict, updates) -> dict:
+    """
+    Apply (user_id, current_level) updates for one partner game in two statements:
+    a bulk upsert of UserGameProgress keyed on (user_id, game_id) that never lowers
+    max_level_reached, and one insert of the LevelCompletion rows the batch crossed.
+    Later updates for the same user win for current_level. Users we don't know are skipped.
+    """
+    levels = {}
+    for user_id, current_level in updates:
+        previous = levels.get(user_id)
+        levels[user_id] = (current_level, max(current_level, previous[1]) if previous else current_level)
+
+    known = set(db.session.execute(select(User.id).where(User.id.in_(list(levels)))).scalars())
+    skipped = [user_id for user_id in levels if user_id not in known]
+    now = datetime.utcnow()
+    rows = [
+        {'user_id': user_id, 'game_id': campaign['link'], 'current_level': current,
+         'max_level_reached': highest, 'updated_at': now}
+        for user_id, (current, highest) in levels.items() if user_id in known
+    ]
+    if not rows:
+        return {'updated': 0, 'completed': 0, 'skipped': skipped}
+
+    progress = UserGameProgress.__table__
+    stmt = dialect_insert(progress).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['user_id', 'game_id'],
+        set_={
+            'current_level': stmt.excluded.current_level,
+            'max_level_reached': case(
+                (stmt.excluded.max_level_reached > progress.c.max_level_reached, stmt.excluded.max_level_reached),
+                else_=progress.c.max_level_reached
+            ),
+            'updated_at': stmt.excluded.updated_at
+        }
+    )
+    db.session.execute(stmt)
+
+    crossed = [
+        {'user_id': row['user_id'], 'campaign_id': campaign['id'],
+         'required_level': campaign['required_level'], 'completed_at': now}
+        for row in rows if row['max_level_reached'] >= campaign['required_level']
+    ]
+    completed = 0
+    if crossed:
+        completed = db.session.execute(
+            dialect_insert(LevelCompletion.__table__).values(crossed)
+            .on_conflict_do_nothing(index_elements=['user_id', 'campaign_id'])
+        ).rowcount
 
+    db.session.commit()
+    return {'updated': len(rows), 'completed': completed, 'skipped': skipped}
 
 
 @app.route("/api/webhook/level-update", methods=["POST"])
@@ -1804,42 +2972,25 @@ def level_update_webhook():
     token = auth_token[7:]  # Remove 'Bearer ' prefix
     
     # Find campaign by token
-    campaign = PartnerCampaign.query.filter_by(webhook_token=token).first()
+    campaign = partner_campaign_for_token(token)
     if not campaign:
         return jsonify({"success": False, "message": "Invalid token"}), 401
     
     # Required fields
     required_fields = ['user_id', 'current_level']
-    if not all(field in data for field in required_fields):
+    if not data or not all(field in data for field in required_fields):
         return jsonify({"success": False, "message": "Missing required fields"}), 400
     
-    user_id = data['user_id']
-    current_level = data['current_level']
+    try:
+        user_id = int(data['user_id'])
+        current_level = int(data['current_level'])
+    except (TypeError, ValueError):
+        return jsonify({"success": False, "message": "user_id and current_level must be integers"}), 400
     
     try:
-        # Update or create user game progress
-        progress = UserGameProgress.query.filter_by(
-            user_id=user_id,
-            game_id=campaign.link  # Use campaign link as game identifier
-        ).first()
-        
-        if progress:
-            progress.current_level = current_level
-            if current_level > progress.max_level_reached:
-                progress.max_level_reached = current_level
-        else:
-            progress = UserGameProgress(
-                user_id=user_id,
-                game_id=campaign.link,
-                current_level=current_level,
-                max_level_reached=current_level
-            )
-            db.session.add(progress)
-        
-        db.session.commit()
-        
-        # Check if user completed this specific partner task
-        check_level_completion(user_id, campaign.id, current_level, campaign.required_level)
+        result = apply_level_updates(campaign, [(user_id, current_level)])
+        if result['skipped']:
+            return jsonify({"success": False, "message": "User not found"}), 404
         
         return jsonify({
             "success": True,
@@ -1851,26 +3002,37 @@ def level_update_webhook():
         print(f"Level update error: {e}")
         return jsonify({"success": False, "message": "Internal server error"}), 500
 
-def check_level_completion(user_id: int, campaign_id: int, current_level: int, required_level: int):
-    """Check if user completed a specific partner task"""
-    if current_level >= required_level:
-        # Check if already completed
-        existing_completion = LevelCompletion.query.filter_by(
-            user_id=user_id,
-            campaign_id=campaign_id
-        ).first()
-        
-        if not existing_completion:
-            # Record completion
-            new_completion = LevelCompletion(
-                user_id=user_id,
-                campaign_id=campaign_id,
-                required_level=required_level
-            )
-            db.session.add(new_completion)
-            db.session.commit()
 
+@app.route("/api/webhook/level-update/batch", methods=["POST"])
+def level_update_batch_webhook():
+    """Body: {"updates": [{"user_id": 123, "current_level": 5}, ...]}, at most LEVEL_UPDATE_BATCH_LIMIT entries"""
+    auth_token = request.headers.get('Authorization')
+    if not auth_token or not auth_token.startswith('Bearer '):
+        return jsonify({"success": False, "message": "Authentication required"}), 401
+
+    campaign = partner_campaign_for_token(auth_token[7:])
+    if not campaign:
+        return jsonify({"success": False, "message": "Invalid token"}), 401
+
+    updates = (request.get_json(silent=True) or {}).get('updates')
+    if not isinstance(updates, list) or not updates:
+        return jsonify({"success": False, "message": "Missing updates"}), 400
+    if len(updates) > LEVEL_UPDATE_BATCH_LIMIT:
+        return jsonify({"success": False, "message": f"At most {LEVEL_UPDATE_BATCH_LIMIT} updates per request"}), 400
+
+    try:
+        parsed = [(int(update['user_id']), int(update['current_level'])) for update in updates]
+    except (KeyError, TypeError, ValueError):
+        return jsonify({"success": False, "message": "Each update needs integer user_id and current_level"}), 400
+
+    try:
+        result = apply_level_updates(campaign, parsed)
+    except Exception as e:
+        db.session.rollback()
+        print(f"Level update batch error: {e}")
+        return jsonify({"success": False, "message": "Internal server error"}), 500
 
+    return jsonify({"success": True, **result})
 
 
 @app.route("/api/webhook-docs/<campaign_id>")
@@ -1907,6 +3069,22 @@ def webhook_docs(campaign_id):
         "response": {
             "success": "boolean",
             "message": "string"
+        },
+        "batch": {
+            "webhook_url": "/api/webhook/level-update/batch",
+            "max_updates": LEVEL_UPDATE_BATCH_LIMIT,
+            "example_payload": {
+                "updates": [
+                    {"user_id": 123456789, "current_level": 5},
+                    {"user_id": 987654321, "current_level": 12}
+                ]
+            },
+            "response": {
+                "success": "boolean",
+                "updated": "number of players whose progress was stored",
+                "completed": "number of players who newly reached the required level",
+                "skipped": "user ids that are not registered with us"
+            }
         }
     })
 
@@ -1926,16 +3104,6 @@ def get_campaign_token(campaign_id):
     })
 
 
-def check_user_started_bot(bot_username: str, user_id: int) -> bool:
-    """
-    Simple implementation - in production, you'd track bot starts in your database
-    For now, we'll use a simple approach: check if user recently interacted with bot
-    """
-    # This is a placeholder - implement your actual bot start tracking logic
-    return True
-
-
-
 @app.route("/user/tasks/status")
 @jwt_required
 def get_user_task_status():
@@ -1961,6 +3129,65 @@ def get_user_task_status():
     return jsonify({"success": True, "taskStatuses": status_map})
 
 
+MAX_STATUS_CAMPAIGN_IDS = 500
+
+
+@app.route("/api/campaigns/completion-status", methods=["POST"])
+@jwt_required
+def get_campaign_completion_status():
+    """
+    Started/completed flags for just the given campaigns, for the signed-in user.
+    With "since" (the "asOf" of a previous response) only rows that changed after
+    it are returned, so the client can poll cheaply.
+    """
+    data = request.get_json() or {}
+    campaign_ids = data.get("campaignIds")
+    since = data.get("since")
+
+    if not isinstance(campaign_ids, list) or len(campaign_ids) > MAX_STATUS_CAMPAIGN_IDS:
+        return jsonify({
+            "success": False,
+            "message": f"campaignIds must be a list of at most {MAX_STATUS_CAMPAIGN_IDS} ids"
+        }), 400
+
+    try:
+        campaign_ids = {int(campaign_id) for campaign_id in campaign_ids}
+        since = datetime.fromisoformat(since) if since else None
+    except (TypeError, ValueError):
+        return jsonify({"success": False, "message": "Invalid campaignIds or since"}), 400
+
+    as_of = datetime.now()
+    status_map = {}
+    if campaign_ids:
+        # (user_id, campaign_id) is the primary key, so this is one index probe per id
+        query = select(
+            user_task_completion.c.campaign_id,
+            user_task_completion.c.started_at,
+            user_task_completion.c.completed_at
+        ).where(
+            (user_task_completion.c.user_id == request.user_id) &
+            (user_task_completion.c.campaign_id.in_(campaign_ids))
+        )
+        if since:
+            query = query.where(
+                (user_task_completion.c.started_at > since) |
+                (user_task_completion.c.completed_at > since)
+            )
+
+        for record in db.session.execute(query):
+            status_map[record.campaign_id] = {
+                "started": record.started_at is not None,
+                "completed": record.completed_at is not None
+            }
+
+    return jsonify({
+        "success": True,
+        "taskStatuses": status_map,
+        "completedCampaignIds": [cid for cid, status in status_map.items() if status["completed"]],
+        "asOf": as_of.isoformat()
+    })
+
+
 
 
 
@@ -2085,6 +3312,7 @@ def get_incomplete_tasks():
     # Use a subquery to find incomplete tasks
     completed_subquery = db.session.query(user_daily_task_completions.c.task_id)\
         .filter(user_daily_task_completions.c.user_id == user_id)\
+        .filter(user_daily_task_completions.c.day == utc_day())\
         .filter(user_daily_task_completions.c.completed_at.isnot(None))\
         .subquery()
     
@@ -2165,6 +3393,7 @@ def delete_daily_task(task_id):
             user_daily_task_completions.c.task_id == task_id
         )
     )
+    reset_completion_shards(DAILY_TASK_COUNTER, task_id)
     
     db.session.delete(task)
     db.session.commit()
@@ -2201,37 +3430,26 @@ def start_daily_task():
     if not user_id or not task_id:
         return jsonify({"success": False, "message": "Missing parameters"}), 400
 
-    user = User.query.get(user_id)
+    user = get_request_user(user_id, columns=(User.id,))
     task = DailyTask.query.get(task_id)
 
     if not user or not task:
         return jsonify({"success": False, "message": "User or Task not found"}), 404
 
-    # Check if already completed today
-    today = datetime.utcnow().date()
-    existing_completion = db.session.execute(
+    # Today's row, if any, is a single primary-key lookup
+    today = utc_day()
+    existing_record = db.session.execute(
         user_daily_task_completions.select().where(
             (user_daily_task_completions.c.user_id == user_id) &
-            (user_daily_task_completions.c.task_id == task_id) &
-            (func.date(user_daily_task_completions.c.completed_at) == today) &
-            (user_daily_task_completions.c.claimed == True)
+            (user_daily_task_completions.c.day == today) &
+            (user_daily_task_completions.c.task_id == task_id)
         )
     ).first()
 
-    if existing_completion:
+    if existing_record and existing_record.claimed:
         return jsonify({"success": False, "message": "Task already completed today"}), 400
 
-    # Check if already started but not completed
-    existing_start = db.session.execute(
-        user_daily_task_completions.select().where(
-            (user_daily_task_completions.c.user_id == user_id) &
-            (user_daily_task_completions.c.task_id == task_id) &
-            (func.date(user_daily_task_completions.c.started_at) == today) &
-            (user_daily_task_completions.c.completed_at.is_(None))
-        )
-    ).first()
-
-    if existing_start:
+    if existing_record:
         return jsonify({"success": True, "message": "Task already started", "status": "started"})
 
     # For ad script tasks, we don't need to open a window, just mark as started
@@ -2239,6 +3457,7 @@ def start_daily_task():
     db.session.execute(user_daily_task_completions.insert().values(
         user_id=user_id,
         task_id=task_id,
+        day=today,
         started_at=datetime.utcnow()
     ))
 
@@ -2261,19 +3480,19 @@ def claim_daily_task():
     if not user_id or not task_id:
         return jsonify({"success": False, "message": "Missing parameters"}), 400
 
-    user = User.query.get(user_id)
+    user = get_request_user(user_id)
     task = DailyTask.query.get(task_id)
 
     if not user or not task:
         return jsonify({"success": False, "message": "User or Task not found"}), 404
 
     # Check if task was started today
-    today = datetime.utcnow().date()
+    today = utc_day()
     existing_record = db.session.execute(
         user_daily_task_completions.select().where(
             (user_daily_task_completions.c.user_id == user_id) &
-            (user_daily_task_completions.c.task_id == task_id) &
-            (func.date(user_daily_task_completions.c.started_at) == today)
+            (user_daily_task_completions.c.day == today) &
+            (user_daily_task_completions.c.task_id == task_id)
         )
     ).first()
 
@@ -2294,8 +3513,8 @@ def claim_daily_task():
     db.session.execute(
         user_daily_task_completions.update().where(
             (user_daily_task_completions.c.user_id == user_id) &
-            (user_daily_task_completions.c.task_id == task_id) &
-            (func.date(user_daily_task_completions.c.started_at) == today)
+            (user_daily_task_completions.c.day == today) &
+            (user_daily_task_completions.c.task_id == task_id)
         ).values(
             completed_at=datetime.utcnow(),
             claimed=True
@@ -2303,7 +3522,7 @@ def claim_daily_task():
     )
 
     # Update task completions
-    task.completions += 1
+    increment_completion_shard(DAILY_TASK_COUNTER, task.id, user.id)
 
     # Reward user
     user.coins += task.reward
@@ -2314,16 +3533,101 @@ def claim_daily_task():
         user.tasks_completed_today_for_spin += 1
 
     db.session.commit()
-    db.session.refresh(user)
 
     return jsonify({
         "success": True,
         "message": f"Task claimed! +{task.reward} coins",
-        "user": user.to_dict(),
+        **user_payload(user),
         "reward": task.reward
     })
 
 
+DAILY_COMPACTION_CHUNK = int(os.getenv('DAILY_COMPACTION_CHUNK', 5000))
+
+
+def compact_daily_task_completions(chunk_size: int = DAILY_COMPACTION_CHUNK) -> int:
+    """
+    Move rows from before today out of user_daily_task_completions in chunks,
+    folding their claimed counts into daily_task_completion_rollups and keeping
+    the raw rows in the archive table. Returns the number of rows moved.
+
+    Rows are taken with DELETE ... RETURNING, so concurrent runs never see the
+    same row twice and cannot double count.
+    """
+    hot = user_daily_task_completions
+    key = tuple_(hot.c.user_id, hot.c.day, hot.c.task_id)
+    moved = 0
+
+    while True:
+        keys = db.session.execute(
+            select(hot.c.user_id, hot.c.day, hot.c.task_id)
+            .where(hot.c.day < utc_day())
+            .order_by(hot.c.day, hot.c.user_id, hot.c.task_id)
+            .limit(chunk_size)
+        ).all()
+        if not keys:
+            return moved
+
+        rows = db.session.execute(
+            hot.delete().where(key.in_([tuple(k) for k in keys])).returning(*hot.c)
+        ).mappings().all()
+
+        if rows:
+            db.session.execute(
+                dialect_insert(user_daily_task_completions_archive).on_conflict_do_nothing(),
+                [dict(row) for row in rows]
+            )
+
+            claimed = {}
+            for row in rows:
+                if row["claimed"]:
+                    bucket = (row["day"], row["task_id"])
+                    claimed[bucket] = claimed.get(bucket, 0) + 1
+
+            rollups = daily_task_completion_rollups
+            for (day, task_id), completions in claimed.items():
+                stmt = dialect_insert(rollups).values(day=day, task_id=task_id, completions=completions)
+                db.session.execute(stmt.on_conflict_do_update(
+                    index_elements=[rollups.c.day, rollups.c.task_id],
+                    set_={"completions": rollups.c.completions + completions}
+                ))
+
+        db.session.commit()
+        moved += len(rows)
+
+
+@app.cli.command("compact-daily-completions")
+@click.option("--chunk-size", default=DAILY_COMPACTION_CHUNK, show_default=True)
+@with_appcontext
+def compact_daily_completions_command(chunk_size):
+    """Roll up and archive daily task completions from past days"""
+    moved = compact_daily_task_completions(chunk_size)
+    click.echo(f"✅ Archived {moved} daily task completions")
+
+
+def run_daily_compaction_worker(interval: int):
+    while True:
+        time.sleep(interval)
+        with app.app_context():
+            try:
+                moved = compact_daily_task_completions()
+                if moved:
+                    print(f"🗄️ Archived {moved} daily task completions")
+            except Exception as e:
+                db.session.rollback()
+                print(f"Daily completion compaction failed: {e}")
+
+
+# Optional in-process schedule (seconds); leave unset when cron runs the CLI command
+DAILY_COMPACTION_INTERVAL = int(os.getenv('DAILY_COMPACTION_INTERVAL', 0))
+if DAILY_COMPACTION_INTERVAL > 0:
+    threading.Thread(
+        target=run_daily_compaction_worker,
+        args=(DAILY_COMPACTION_INTERVAL,),
+        daemon=True
+    ).start()
+
+
 @app.route("/user/daily-tasks/status")
 @jwt_required
 def get_user_daily_task_status():
@@ -2333,11 +3637,10 @@ def get_user_daily_task_status():
         return jsonify({"success": False, "message": "Missing user ID"}), 400
 
     # Get today's task statuses for this user
-    today = datetime.utcnow().date()
     task_statuses = db.session.execute(
         user_daily_task_completions.select().where(
             (user_daily_task_completions.c.user_id == user_id) &
-            (func.date(user_daily_task_completions.c.started_at) == today)
+            (user_daily_task_completions.c.day == utc_day())
         )
     ).all()
 
@@ -2389,7 +3692,7 @@ def get_all_users():
             error_out=False
         )
         
-        users_data = [user.to_dict() for user in paginated_users.items]
+        users_data = serialize_users(paginated_users.items, include_friends_requested())
         
         return jsonify({
             "users": users_data,
@@ -2407,7 +3710,7 @@ def get_all_users():
 def get_user_by_id(user_id):
     try:
         user = User.query.get_or_404(user_id)
-        return jsonify(user.to_dict())
+        return jsonify(serialize_users([user], include_friends_requested())[0])
     except Exception as e:
         app.logger.error(f"Error fetching user {user_id}: {str(e)}")
         return jsonify({"error": "Failed to fetch user"}), 500
@@ -2448,6 +3751,8 @@ def update_user(user_id):
                 setattr(user, field, data[field])
         
         db.session.commit()
+        if 'banned' in data:
+            invalidate_user_tokens(user.id)
         
         return jsonify(user.to_dict())
         
@@ -2469,6 +3774,7 @@ def toggle_user_ban(user_id):
         
         user.banned = bool(data['banned'])
         db.session.commit()
+        invalidate_user_tokens(user.id)
         
         return jsonify(user.to_dict())
         
@@ -2585,7 +3891,7 @@ def search_users():
         else:
             return jsonify({"error": "Invalid search field"}), 400
         
-        users_data = [user.to_dict() for user in users]
+        users_data = serialize_users(users, include_friends_requested())
         return jsonify(users_data)
         
     except Exception as e:
@@ -2633,9 +3939,12 @@ def bulk_update_users():
                 updated_users.append(user)
         
         db.session.commit()
+        if 'banned' in filtered_updates:
+            for user in updated_users:
+                invalidate_user_tokens(user.id)
         
         # Return updated user data
-        users_data = [user.to_dict() for user in updated_users]
+        users_data = serialize_users(updated_users, include_friends_requested())
         return jsonify(users_data)
         
     except Exception as e:
@@ -2679,7 +3988,7 @@ def export_users():
                     user.tasks_completed_today_for_spin,
                     user.friends_invited_today_for_spin,
                     user.banned,
-                    user.created_at.isoformat() if hasattr(user, 'created_at') else ''
+                    user.created_at.isoformat() if user.created_at else ''
                 ])
             
             output.seek(0)
@@ -2693,7 +4002,7 @@ def export_users():
             )
             
         else:  # JSON format
-            users_data = [user.to_dict() for user in users]
+            users_data = serialize_users(users, include_friends_requested())
             
             return Response(
                 json.dumps(users_data, indent=2),
@@ -2743,13 +4052,6 @@ def get_user_stats():
         app.logger.error(f"Error getting user stats: {str(e)}")
         return jsonify({"error": "Failed to get user statistics"}), 500
 
-# Add created_at field to User model if not exists
-# class User(db.Model):
-#     # ... existing fields ...
-#     created_at = db.Column(db.DateTime, default=db.func.current_timestamp())
-
-
-
 @app.route('/api/referral/claim', methods=['POST'])
 @jwt_required
 def claim_referral_earnings():
@@ -2763,7 +4065,7 @@ def claim_referral_earnings():
             return jsonify({"success": False, "message": "Unauthorized"}), 401
         
         # Get user from database
-        user = User.query.get(user_id_from_request)
+        user = get_request_user(user_id_from_request)
         if not user:
             return jsonify({"success": False, "message": "User not found"}), 404
         
@@ -2780,7 +4082,7 @@ def claim_referral_earnings():
         return jsonify({
             "success": True,
             "message": f"Claimed {earnings} coins from referrals",
-            "user": user.to_dict()
+            **user_payload(user)
         })
         
     except Exception as e:
@@ -2796,7 +4098,7 @@ def invite_friend_for_spin():
     if not user_id:
         return jsonify({"success": False, "message": "user_id is required"}), 400
     
-    user = User.query.get(user_id)
+    user = get_request_user(user_id)
     
     if not user:
         return jsonify({"success": False, "message": "User not found"}), 404
@@ -2834,7 +4136,7 @@ def get_referral_friends():
         # SECURITY: Verify the requesting user matches the JWT user
        
         # Get user from database
-        user = User.query.get(user_id)
+        user = get_request_user(user_id, columns=(User.id,))
         if not user:
             return jsonify({"success": False, "message": "User not found"}), 404
         
@@ -2888,7 +4190,10 @@ def get_referral_info():
     if not user_id:
         return jsonify({"success": False, "error": "user_id is required"}), 400
     
-    user = User.query.get(user_id)
+    user = get_request_user(user_id, columns=(
+        User.id, User.referral_count, User.referral_earnings,
+        User.total_referral_earnings, User.friends_invited_today_for_spin
+    ))
     
     if not user:
         return jsonify({"success": False, "error": "User not found"}), 404
@@ -2941,11 +4246,11 @@ def get_referral_info():
 
 def award_referral_earnings(user_id: int, task_reward: int):
     """Award 10% of task rewards to referrer (to be claimed later) AND give them 1 spin immediately"""
-    user = User.query.get(user_id)
+    user = get_request_user(user_id)
     if not user or not user.referred_by:
         return
     
-    referrer = User.query.get(user.referred_by)
+    referrer = get_request_user(user.referred_by)
     if not referrer:
         return
     
@@ -2981,7 +4286,8 @@ def daily_reset():
         User.query.update({
             User.ads_watched_today: 0,
             User.tasks_completed_today_for_spin: 0,
-            User.friends_invited_today_for_spin: 0
+            User.friends_invited_today_for_spin: 0,
+            User.balance_version: User.balance_version + 1
         })
         
         db.session.commit()
@@ -3017,7 +4323,7 @@ def deposit_ad_credit():
         }), 400
 
     try:
-        user = User.query.get(user_id)
+        user = get_request_user(user_id)
         if not user:
             return jsonify({
                 "success": False,
@@ -3059,7 +4365,7 @@ def deposit_ad_credit():
         return jsonify({
             "success": True,
             "message": "Deposit successful",
-            "user": user.to_dict()
+            **user_payload(user)
         })
 
     except Exception as e:
@@ -3207,7 +4513,7 @@ def spin_wheel():
         if not user_id:
             return jsonify({"success": False, "message": "User ID required"}), 400
         
-        user = User.query.get(user_id)
+        user = get_request_user(user_id)
         if not user:
             return jsonify({"success": False, "message": "User not found"}), 404
         
@@ -3291,7 +4597,7 @@ def spin_wheel():
         return jsonify({
             "success": True,
             "prize": selected_prize,
-            "user": user.to_dict(),
+            **user_payload(user),
             "message": message
         })
         
@@ -3313,7 +4619,7 @@ def watch_ad_for_spin():
         if not user_id:
             return jsonify({"success": False, "message": "User ID required"}), 400
         
-        user = User.query.get(user_id)
+        user = get_request_user(user_id)
         if not user:
             return jsonify({"success": False, "message": "User not found"}), 404
         
@@ -3333,7 +4639,7 @@ def watch_ad_for_spin():
         return jsonify({
             "success": True,
             "message": "Thanks for watching! +1 Spin!",
-            "user": user.to_dict()
+            **user_payload(user)
         })
         
     except Exception as e:
@@ -3423,7 +4729,7 @@ def buy_spins():  # Remove async here
         if not user_id or not package_id or not payment_method:
             return jsonify({"success": False, "message": "Missing parameters"}), 400
 
-        user = User.query.get(user_id)
+        user = get_request_user(user_id)
         if not user:
             return jsonify({"success": False, "message": "User not found"}), 404
 
@@ -3540,7 +4846,7 @@ def buy_spins():  # Remove async here
         return jsonify({
             "success": True,
             "message": message,
-            "user": user.to_dict()
+            **user_payload(user)
         })
 
     except Exception as e:
@@ -3566,9 +4872,15 @@ def verify_ton_transaction_sync(user_id: int, transaction_boc: str, expected_amo
         print(f"TON verification error: {e}")
 
 
-def verify_ton_transaction_sync_logic(transaction_boc: str, expected_amount: Decimal) -> bool:
+TON_VERIFICATION_DEADLINE = float(os.getenv('TON_VERIFICATION_DEADLINE', 30))
+TON_VERIFIER_URL = os.getenv('TON_VERIFIER_URL', 'http://bot.cashubux.com/api/v1/payments/ton-webhook')
+
+
+def verify_ton_transaction_sync_logic(transaction_boc: str, expected_amount: Decimal,
+                                      deadline: Optional[Deadline] = None) -> bool:
     """
-    Synchronous TON transaction verification
+    Synchronous TON transaction verification.
+    Fails closed: anything short of a definite "valid" from the verifier returns False.
     """
     try:
         # Use your TON API key here
@@ -3576,8 +4888,6 @@ def verify_ton_transaction_sync_logic(transaction_boc: str, expected_amount: Dec
         MERCHANT_WALLET = "UQCUj1nsD2CHdyBoO8zIUqwlL-QXpyeUsMbePiegTqURiJu0"
         
         # This is a simplified synchronous version
-        # You'll need to use a synchronous HTTP client like requests
-        import requests
         
         payload = {
             'boc': transaction_boc,
@@ -3590,23 +4900,29 @@ def verify_ton_transaction_sync_logic(transaction_boc: str, expected_amount: Dec
             'Content-Type': 'application/json'
         }
         
-        response = requests.post(
-            'http://bot.cashubux.com/api/v1/payments/ton-webhook',
-            headers=headers,
-            json=payload,
-            timeout=30
+        deadline = deadline or Deadline(TON_VERIFICATION_DEADLINE)
+        status, result = verification_engine.run(
+            verification_engine.post_json(
+                TON_VERIFIER_URL,
+                payload,
+                headers=headers,
+                deadline=deadline
+            ),
+            deadline,
+            upstream='ton'
         )
         
-        if response.status_code == 200:
-            result = response.json()
-            return result.get('valid', False)
+        if status == 200 and result:
+            return result.get('valid', False) is True
         
         return False
         
+    except (VerificationTimeout, UpstreamError, CircuitOpen) as e:
+        print(f"TON verifier unavailable, treating transaction as unverified: {e!r}")
+        return False
     except Exception as e:
         print(f"TON transaction verification error: {e}")
-        # For development, return True; in production, handle properly
-        return True
+        return False
 
 
 
@@ -3623,7 +4939,7 @@ def withdraw_ton():
     if not user_id:
         return jsonify({"success": False, "message": "Missing userId"}), 400
 
-    user = User.query.get(user_id)
+    user = get_request_user(user_id)
     if not user:
         return jsonify({"success": False, "message": "User not found"}), 404
 
@@ -3683,7 +4999,7 @@ def withdraw_ton():
         return jsonify({
             "success": True,
             "message": message,
-            "user": user.to_dict(),
+            **user_payload(user),
             "transactionId": transaction.id,
             "requiresApproval": not settings.auto_withdrawals
         })
@@ -4042,12 +5358,15 @@ def get_dashboard_stats():
         total_withdrawals = abs(float(total_withdrawals_result)) if total_withdrawals_result else 0.0
         
         # Tasks Completed (sum of all task completions)
-        # Count daily task completions
-        daily_tasks_completed = db.session.query(
+        # Count daily task completions: compacted days come from the rollups,
+        # only today's (and not yet compacted) rows are counted directly
+        daily_tasks_completed = (db.session.query(
+            func.sum(daily_task_completion_rollups.c.completions)
+        ).scalar() or 0) + (db.session.query(
             func.count(user_daily_task_completions.c.user_id)
         ).filter(
             user_daily_task_completions.c.claimed == True
-        ).scalar() or 0
+        ).scalar() or 0)
         
         # Count campaign task completions
         campaign_tasks_completed = db.session.query(
@@ -4085,6 +5404,24 @@ def get_dashboard_stats():
 
 
 
+@app.route('/api/admin/metrics', methods=['GET'])
+@jwt_required
+def get_runtime_metrics():
+    """Per-worker cache counters, used to size caches and measure their effect"""
+    return jsonify({
+        'success': True,
+        'caches': {
+            'jwt': JWT_CACHE.stats(),
+            'init_data': INIT_DATA_CACHE.stats(),
+            'membership': MEMBERSHIP_CACHE.stats(),
+            'bot_starts': BOT_START_CACHE.stats()
+        },
+        'bot_start_filter': BOT_START_BLOOM.stats(),
+        'http': http_client.stats(),
+        'verification': verification_engine.stats()
+    })
+
+
 # @app.route('/campaign/reactivate', methods=['POST'])
 # @jwt_required
 # def reactivate_campaign():
@@ -4172,7 +5509,7 @@ def reactivate_campaign():
         if not user_id or not campaign_id:
             return jsonify({'success': False, 'message': 'Missing required fields'}), 400
         
-        user = User.query.get(user_id)
+        user = get_request_user(user_id)
         
         # Check if user has this campaign in their completions
         campaign_completion = db.session.query(user_task_completion).filter_by(
@@ -4202,6 +5539,8 @@ def reactivate_campaign():
         
         # Reset campaign completions to 0
         campaign.completions = 0
+        reset_completion_shards(CAMPAIGN_COUNTER, campaign.id)
+        campaign.status = CampaignStatus.ACTIVE
         
         # Delete ALL completed records for this user in this campaign
         # db.session.execute(
@@ -4224,6 +5563,7 @@ def reactivate_campaign():
         
        
         db.session.commit()
+        invalidate_campaign_catalog()
         
         return jsonify({
             'success': True,
@@ -0,0 +1,39 @@
+"""add daily completion rollups and archive
+
+Revision ID: 3f6d2b8e41a7
+Revises: b7e93f05c1d8
+Create Date: 2026-10-18 15:11:38.027415
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f6d2b8e41a7'
+down_revision = 'b7e93f05c1d8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('daily_task_completion_rollups',
+    sa.Column('day', sa.Integer(), nullable=False),
+    sa.Column('task_id', sa.String(), nullable=False),
+    sa.Column('completions', sa.Integer(), server_default='0', nullable=False),
+    sa.PrimaryKeyConstraint('day', 'task_id')
+    )
+    op.create_table('user_daily_task_completions_archive',
+    sa.Column('user_id', sa.BigInteger(), nullable=False),
+    sa.Column('task_id', sa.String(), nullable=False),
+    sa.Column('day', sa.Integer(), nullable=False),
+    sa.Column('started_at', sa.TIMESTAMP(), nullable=True),
+    sa.Column('completed_at', sa.TIMESTAMP(), nullable=True),
+    sa.Column('claimed', sa.Boolean(), nullable=True),
+    sa.PrimaryKeyConstraint('user_id', 'day', 'task_id')
+    )
+
+
+def downgrade():
+    op.drop_table('user_daily_task_completions_archive')
+    op.drop_table('daily_task_completion_rollups')
@@ -0,0 +1,26 @@
+"""add users.balance_version
+
+Revision ID: 412dac4640d3
+Revises: bbd68279d39a
+Create Date: 2026-10-18 10:03:27.551904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '412dac4640d3'
+down_revision = 'bbd68279d39a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('balance_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('balance_version')
@@ -0,0 +1,30 @@
+"""add completion_shards
+
+Revision ID: 5e1f0c7a92b4
+Revises: d2c3ee413606
+Create Date: 2026-10-18 12:06:41.518302
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e1f0c7a92b4'
+down_revision = 'd2c3ee413606'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('completion_shards',
+    sa.Column('counter', sa.String(length=20), nullable=False),
+    sa.Column('task_id', sa.Integer(), nullable=False),
+    sa.Column('shard', sa.SmallInteger(), nullable=False),
+    sa.Column('count', sa.Integer(), server_default='0', nullable=False),
+    sa.PrimaryKeyConstraint('counter', 'task_id', 'shard')
+    )
+
+
+def downgrade():
+    op.drop_table('completion_shards')
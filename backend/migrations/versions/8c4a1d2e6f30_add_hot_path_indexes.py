@@ -0,0 +1,68 @@
+"""add hot path indexes
+
+Revision ID: 8c4a1d2e6f30
+Revises: 5e1f0c7a92b4
+Create Date: 2026-10-18 13:20:52.104877
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c4a1d2e6f30'
+down_revision = '5e1f0c7a92b4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('user_task_completions', schema=None) as batch_op:
+        batch_op.create_index('idx_user_task_completed', ['user_id', 'completed_at'], unique=False)
+
+    with op.batch_alter_table('user_daily_task_completions', schema=None) as batch_op:
+        batch_op.create_index('idx_user_daily_started', ['user_id', 'started_at'], unique=False)
+
+    with op.batch_alter_table('transactions', schema=None) as batch_op:
+        batch_op.create_index('idx_transaction_type_status_created', ['transaction_type', 'status', 'created_at'], unique=False)
+        batch_op.create_index(batch_op.f('ix_transactions_transaction_id_on_blockchain'), ['transaction_id_on_blockchain'], unique=False)
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_users_referred_by'), ['referred_by'], unique=False)
+
+    with op.batch_alter_table('spin_history', schema=None) as batch_op:
+        batch_op.create_index('idx_spin_history_user_created', ['user_id', 'created_at'], unique=False)
+
+    # referrals(referrer_id) is already served by the unique_referral
+    # (referrer_id, referred_id) constraint, so no extra index there.
+
+    # Keep the most recent row per (user_id, game_id) before making the pair unique
+    op.execute(
+        "DELETE FROM user_game_progress WHERE id NOT IN ("
+        "SELECT MAX(id) FROM user_game_progress GROUP BY user_id, game_id)"
+    )
+    with op.batch_alter_table('user_game_progress', schema=None) as batch_op:
+        batch_op.drop_index('idx_user_game')
+        batch_op.create_index('idx_user_game', ['user_id', 'game_id'], unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table('user_game_progress', schema=None) as batch_op:
+        batch_op.drop_index('idx_user_game')
+        batch_op.create_index('idx_user_game', ['user_id', 'game_id'], unique=False)
+
+    with op.batch_alter_table('spin_history', schema=None) as batch_op:
+        batch_op.drop_index('idx_spin_history_user_created')
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_users_referred_by'))
+
+    with op.batch_alter_table('transactions', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_transactions_transaction_id_on_blockchain'))
+        batch_op.drop_index('idx_transaction_type_status_created')
+
+    with op.batch_alter_table('user_daily_task_completions', schema=None) as batch_op:
+        batch_op.drop_index('idx_user_daily_started')
+
+    with op.batch_alter_table('user_task_completions', schema=None) as batch_op:
+        batch_op.drop_index('idx_user_task_completed')
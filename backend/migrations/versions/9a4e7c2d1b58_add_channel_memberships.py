@@ -0,0 +1,30 @@
+"""add channel memberships
+
+Revision ID: 9a4e7c2d1b58
+Revises: 3f6d2b8e41a7
+Create Date: 2026-10-18 16:02:17.513904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9a4e7c2d1b58'
+down_revision = '3f6d2b8e41a7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('channel_memberships',
+    sa.Column('chat_id', sa.String(length=64), nullable=False),
+    sa.Column('user_id', sa.BigInteger(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('chat_id', 'user_id')
+    )
+
+
+def downgrade():
+    op.drop_table('channel_memberships')
@@ -0,0 +1,28 @@
+"""add bot starts recorded_at
+
+Revision ID: a6d3e8f15b20
+Revises: f2a7b9c3d4e1
+Create Date: 2026-10-18 19:12:09.318425
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a6d3e8f15b20'
+down_revision = 'f2a7b9c3d4e1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('bot_starts', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('recorded_at', sa.DateTime(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_bot_starts_recorded_at'), ['recorded_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('bot_starts', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_bot_starts_recorded_at'))
+        batch_op.drop_column('recorded_at')
@@ -0,0 +1,56 @@
+"""add user_daily_task_completions.day
+
+Revision ID: b7e93f05c1d8
+Revises: 8c4a1d2e6f30
+Create Date: 2026-10-18 14:02:17.660142
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e93f05c1d8'
+down_revision = '8c4a1d2e6f30'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    bind = op.get_bind()
+
+    with op.batch_alter_table('user_daily_task_completions', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('day', sa.Integer(), nullable=True))
+
+    # Backfill the UTC epoch-day from started_at (falling back to completed_at)
+    if bind.dialect.name == 'postgresql':
+        day_expr = "(COALESCE(started_at, completed_at)::date - DATE '1970-01-01')"
+    else:
+        day_expr = "CAST(julianday(COALESCE(started_at, completed_at)) - 2440587.5 AS INTEGER)"
+    op.execute(f"UPDATE user_daily_task_completions SET day = COALESCE({day_expr}, 0)")
+
+    with op.batch_alter_table('user_daily_task_completions', schema=None) as batch_op:
+        if bind.dialect.name == 'postgresql':
+            batch_op.drop_constraint('user_daily_task_completions_pkey', type_='primary')
+        batch_op.alter_column('day', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_primary_key('user_daily_task_completions_pkey', ['user_id', 'day', 'task_id'])
+        batch_op.drop_index('idx_user_daily_started')
+
+
+def downgrade():
+    bind = op.get_bind()
+
+    # Only the latest day per (user, task) fits the old primary key
+    op.execute(
+        "DELETE FROM user_daily_task_completions WHERE day < ("
+        "SELECT MAX(latest.day) FROM user_daily_task_completions AS latest "
+        "WHERE latest.user_id = user_daily_task_completions.user_id "
+        "AND latest.task_id = user_daily_task_completions.task_id)"
+    )
+
+    with op.batch_alter_table('user_daily_task_completions', schema=None) as batch_op:
+        batch_op.create_index('idx_user_daily_started', ['user_id', 'started_at'], unique=False)
+        if bind.dialect.name == 'postgresql':
+            batch_op.drop_constraint('user_daily_task_completions_pkey', type_='primary')
+        batch_op.create_primary_key('user_daily_task_completions_pkey', ['user_id', 'task_id'])
+        batch_op.drop_column('day')
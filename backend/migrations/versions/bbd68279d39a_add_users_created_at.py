@@ -0,0 +1,26 @@
+"""add users.created_at
+
+Revision ID: bbd68279d39a
+Revises: 701a0ecf8276
+Create Date: 2026-10-18 09:12:40.118392
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'bbd68279d39a'
+down_revision = '701a0ecf8276'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('created_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('created_at')
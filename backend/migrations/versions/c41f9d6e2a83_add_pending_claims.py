@@ -0,0 +1,37 @@
+"""add pending claims
+
+Revision ID: c41f9d6e2a83
+Revises: e5b18f3a7c02
+Create Date: 2026-10-18 17:20:44.601352
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41f9d6e2a83'
+down_revision = 'e5b18f3a7c02'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('pending_claims',
+    sa.Column('user_id', sa.BigInteger(), nullable=False),
+    sa.Column('campaign_id', sa.BigInteger(), nullable=False),
+    sa.Column('queued_at', sa.DateTime(), nullable=False),
+    sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['campaign_id'], ['user_campaigns.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'campaign_id')
+    )
+    with op.batch_alter_table('pending_claims', schema=None) as batch_op:
+        batch_op.create_index('idx_pending_claims_queued_at', ['queued_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('pending_claims', schema=None) as batch_op:
+        batch_op.drop_index('idx_pending_claims_queued_at')
+
+    op.drop_table('pending_claims')
@@ -0,0 +1,38 @@
+"""add campaign_langs
+
+Revision ID: d2c3ee413606
+Revises: 412dac4640d3
+Create Date: 2026-10-18 10:41:09.273615
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2c3ee413606'
+down_revision = '412dac4640d3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    campaign_langs = op.create_table('campaign_langs',
+    sa.Column('lang', sa.String(length=10), nullable=False),
+    sa.Column('campaign_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['campaign_id'], ['user_campaigns.id'], ),
+    sa.PrimaryKeyConstraint('lang', 'campaign_id')
+    )
+
+    # Backfill from the JSON langs array; unrestricted campaigns get '*'
+    user_campaigns = sa.table('user_campaigns', sa.column('id', sa.Integer()), sa.column('langs', sa.JSON()))
+    rows = []
+    for campaign_id, langs in op.get_bind().execute(sa.select(user_campaigns.c.id, user_campaigns.c.langs)):
+        for lang in sorted({lang for lang in (langs or []) if lang} or {'*'}):
+            rows.append({'lang': lang, 'campaign_id': campaign_id})
+    if rows:
+        op.bulk_insert(campaign_langs, rows)
+
+
+def downgrade():
+    op.drop_table('campaign_langs')
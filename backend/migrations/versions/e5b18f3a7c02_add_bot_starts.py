@@ -0,0 +1,29 @@
+"""add bot starts
+
+Revision ID: e5b18f3a7c02
+Revises: 9a4e7c2d1b58
+Create Date: 2026-10-18 16:41:05.228716
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5b18f3a7c02'
+down_revision = '9a4e7c2d1b58'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('bot_starts',
+    sa.Column('bot_username', sa.String(length=64), nullable=False),
+    sa.Column('user_id', sa.BigInteger(), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('bot_username', 'user_id')
+    )
+
+
+def downgrade():
+    op.drop_table('bot_starts')
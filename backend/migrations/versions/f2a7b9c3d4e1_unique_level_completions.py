@@ -0,0 +1,31 @@
+"""unique level completions per user and campaign
+
+Revision ID: f2a7b9c3d4e1
+Revises: c41f9d6e2a83
+Create Date: 2026-10-18 18:05:31.774218
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2a7b9c3d4e1'
+down_revision = 'c41f9d6e2a83'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Keep the first completion per (user_id, campaign_id) before making the pair unique
+    op.execute(
+        "DELETE FROM level_completions WHERE id NOT IN ("
+        "SELECT MIN(id) FROM level_completions GROUP BY user_id, campaign_id)"
+    )
+    with op.batch_alter_table('level_completions', schema=None) as batch_op:
+        batch_op.create_index('uq_level_completion_user_campaign', ['user_id', 'campaign_id'], unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table('level_completions', schema=None) as batch_op:
+        batch_op.drop_index('uq_level_completion_user_campaign')
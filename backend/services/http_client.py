@@ -0,0 +1,126 @@
+# services/http_client.py
+import os
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+
+
+class PooledHTTPClient:
+    """
+    Keep-alive HTTP client shared by every thread in the worker.
+
+    All threads share one HTTPAdapter, so connections to api.telegram.org and
+    the TON verifier are pooled and reused instead of re-handshaking per call.
+    Each thread gets its own requests.Session on top of it (sessions are not
+    thread-safe; the adapter's connection pool is).
+
+    Connection failures are retried for every call since nothing reached the
+    server. 429/5xx responses are only retried for calls marked idempotent,
+    with exponential backoff that honours Retry-After.
+    """
+
+    def __init__(self, pool_maxsize: int = 10, pool_hosts: int = 10,
+                 connect_timeout: float = 3.05, read_timeout: float = 10,
+                 retries: int = 2, backoff_factor: float = 0.3):
+        self.pool_maxsize = pool_maxsize
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+
+        # pool_block caps open connections per host at pool_maxsize; extra
+        # callers wait for a free connection instead of opening throwaway ones
+        self._adapter = HTTPAdapter(
+            pool_connections=pool_hosts,
+            pool_maxsize=pool_maxsize,
+            pool_block=True,
+            max_retries=Retry(total=retries, connect=retries, read=0, status=0, other=0,
+                              backoff_factor=backoff_factor, raise_on_status=False),
+        )
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, Dict[str, int]] = {}
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.mount("https://", self._adapter)
+            session.mount("http://", self._adapter)
+            self._local.session = session
+        return session
+
+    def _host_stats(self, host: str) -> Dict[str, int]:
+        stats = self._hosts.get(host)
+        if stats is None:
+            stats = self._hosts[host] = {
+                "requests": 0, "errors": 0, "retries": 0,
+                "in_flight": 0, "peak_in_flight": 0, "saturated": 0,
+            }
+        return stats
+
+    def request(self, method: str, url: str, idempotent: Optional[bool] = None,
+                timeout=None, **kwargs) -> requests.Response:
+        if idempotent is None:
+            idempotent = method.upper() in ("GET", "HEAD", "OPTIONS")
+        host = urlparse(url).netloc
+
+        with self._lock:
+            stats = self._host_stats(host)
+            stats["requests"] += 1
+            if stats["in_flight"] >= self.pool_maxsize:
+                stats["saturated"] += 1
+            stats["in_flight"] += 1
+            stats["peak_in_flight"] = max(stats["peak_in_flight"], stats["in_flight"])
+
+        try:
+            attempt = 0
+            while True:
+                response = self._session().request(method, url, timeout=timeout or self.timeout, **kwargs)
+                if not idempotent or response.status_code not in RETRYABLE_STATUSES or attempt >= self.retries:
+                    return response
+
+                retry_after = response.headers.get("Retry-After")
+                delay = float(retry_after) if retry_after and retry_after.isdigit() \
+                    else self.backoff_factor * (2 ** attempt)
+                attempt += 1
+                with self._lock:
+                    stats["retries"] += 1
+                time.sleep(delay)
+        except Exception:
+            with self._lock:
+                stats["errors"] += 1
+            raise
+        finally:
+            with self._lock:
+                stats["in_flight"] -= 1
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "pool_maxsize": self.pool_maxsize,
+                "hosts": {host: dict(stats) for host, stats in self._hosts.items()},
+            }
+
+
+http_client = PooledHTTPClient(
+    pool_maxsize=int(os.getenv('HTTP_POOL_MAXSIZE', 10)),
+    pool_hosts=int(os.getenv('HTTP_POOL_HOSTS', 10)),
+    connect_timeout=float(os.getenv('HTTP_CONNECT_TIMEOUT', 3.05)),
+    read_timeout=float(os.getenv('HTTP_READ_TIMEOUT', 10)),
+    retries=int(os.getenv('HTTP_RETRIES', 2)),
+    backoff_factor=float(os.getenv('HTTP_BACKOFF_FACTOR', 0.3)),
+)
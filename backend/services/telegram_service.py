@@ -3,16 +3,27 @@ import requests
 import os
 from typing import Optional, Dict, List
 
+from cache import TTLCache
+from services.http_client import http_client
+
 class TelegramService:
-    def __init__(self, bot_token: str):
+    def __init__(self, bot_token: str, chat_access_ttl: int = 600, api_base: str = "https://api.telegram.org"):
         self.bot_token = bot_token
-        self.base_url = f"https://api.telegram.org/bot{bot_token}"
+        self.base_url = f"{api_base}/bot{bot_token}"
+
+        # getMe never changes for a token, so it is fetched once per process
+        self._me: Optional[Dict] = None
+        # chat identifier -> chat_id format the Bot API accepted
+        self._resolved_chat_ids = TTLCache(maxsize=10000)
+        # chat identifier -> successful verify_chat_access() result
+        self._chat_access = TTLCache(maxsize=10000, ttl=chat_access_ttl)
     
     def make_request(self, method: str, params: Dict) -> Optional[Dict]:
         """Generic method to make Telegram API requests"""
         try:
             url = f"{self.base_url}/{method}"
-            response = requests.post(url, json=params, timeout=10)
+            # Bot API get* methods are reads and safe to retry
+            response = http_client.post(url, json=params, idempotent=method.startswith("get"))
             response.raise_for_status()
             return response.json()
         except requests.exceptions.HTTPError as e:
@@ -26,7 +37,7 @@ class TelegramService:
     def get_chat_member(self, chat_id: str, user_id: int) -> Optional[Dict]:
         """Get chat member information using Telegram API"""
         # Try different chat ID formats
-        formats_to_try = self.get_chat_id_formats(chat_id)
+        formats_to_try = self.resolved_chat_id_formats(chat_id)
         
         for chat_format in formats_to_try:
             result = self.make_request("getChatMember", {
@@ -35,6 +46,7 @@ class TelegramService:
             })
             
             if result and result.get('ok'):
+                self._resolved_chat_ids.set(chat_id, chat_format)
                 return result
             
             if result and not result.get('ok'):
@@ -65,28 +77,44 @@ class TelegramService:
                 formats.append(f"-100{numeric_id}")
         
         return formats
+
+    def resolved_chat_id_formats(self, chat_identifier: str) -> List[str]:
+        """get_chat_id_formats, with the format that worked last time moved to the front"""
+        formats = self.get_chat_id_formats(chat_identifier)
+        resolved = self._resolved_chat_ids.get(chat_identifier)
+        if resolved in formats:
+            formats.remove(resolved)
+            formats.insert(0, resolved)
+        return formats
     
     def get_chat(self, chat_id: str) -> Optional[Dict]:
         """Get chat information"""
-        formats_to_try = self.get_chat_id_formats(chat_id)
+        formats_to_try = self.resolved_chat_id_formats(chat_id)
         
         for chat_format in formats_to_try:
             result = self.make_request("getChat", {"chat_id": chat_format})
             if result and result.get('ok'):
+                self._resolved_chat_ids.set(chat_id, chat_format)
                 return result
         return None
     
     def get_me(self) -> Optional[Dict]:
         """Get bot information"""
-        return self.make_request("getMe", {})
+        if self._me is None:
+            result = self.make_request("getMe", {})
+            if not result or not result.get('ok'):
+                return result
+            self._me = result
+        return self._me
     
     def get_chat_administrators(self, chat_id: str) -> Optional[List[Dict]]:
         """Get chat administrators"""
-        formats_to_try = self.get_chat_id_formats(chat_id)
+        formats_to_try = self.resolved_chat_id_formats(chat_id)
         
         for chat_format in formats_to_try:
             result = self.make_request("getChatAdministrators", {"chat_id": chat_format})
             if result and result.get('ok'):
+                self._resolved_chat_ids.set(chat_id, chat_format)
                 return result.get('result', [])
         return None
     
@@ -112,7 +140,15 @@ class TelegramService:
         return False
     
     def verify_chat_access(self, chat_id: str) -> Dict:
-        """Comprehensive chat access verification"""
+        """
+        Comprehensive chat access verification.
+        Successful results are cached per chat for chat_access_ttl seconds;
+        failures are not, so fixing the bot's rights takes effect immediately.
+        """
+        cached = self._chat_access.get(chat_id)
+        if cached is not None:
+            return cached
+
         result = {
             'chat_exists': False,
             'bot_is_admin': False,
@@ -135,6 +171,8 @@ class TelegramService:
             
             if not result['bot_is_admin']:
                 result['error'] = 'Bot is not an administrator in this chat'
+            else:
+                self._chat_access.set(chat_id, result)
         
         return result
     
@@ -168,4 +206,8 @@ class TelegramService:
         return is_member
 
 # Initialize with your bot token
-telegram_service = TelegramService(os.getenv('TELEGRAM_BOT_TOKEN'))
\ No newline at end of file
+telegram_service = TelegramService(
+    os.getenv('TELEGRAM_BOT_TOKEN'),
+    chat_access_ttl=int(os.getenv('TELEGRAM_CHAT_ACCESS_TTL', 600)),
+    api_base=os.getenv('TELEGRAM_API_BASE', 'https://api.telegram.org')
+)
\ No newline at end of file
@@ -0,0 +1,307 @@
+# services/verification.py
+import asyncio
+import concurrent.futures
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import aiohttp
+
+
+class VerificationTimeout(Exception):
+    """The upstream did not answer within the caller's deadline"""
+
+
+class UpstreamError(Exception):
+    """The upstream failed to give an answer (transport error, 429 or 5xx)"""
+
+
+class CircuitOpen(Exception):
+    """The upstream's circuit breaker is open; the call was not attempted"""
+
+
+class Deadline:
+    """Time budget for one request, shared by every outbound call made while serving it"""
+
+    def __init__(self, seconds: float):
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+
+class CircuitBreaker:
+    """
+    Per-upstream breaker. After failure_threshold consecutive failures it opens and
+    calls are rejected without being attempted. Once reset_timeout has passed it
+    goes half-open and lets a single probe through: success closes it, failure
+    opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.trips = 0
+        self.rejected = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                return True
+            # Open, or half-open with the probe still in flight
+            self.rejected += 1
+            return False
+
+    @property
+    def is_open(self) -> bool:
+        """True while calls would be rejected (does not consume the half-open probe)"""
+        with self._lock:
+            return self.state == self.HALF_OPEN or (
+                self.state == self.OPEN and time.monotonic() - self.opened_at < self.reset_timeout
+            )
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.state = self.CLOSED
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or (self.state == self.CLOSED and self.failures >= self.failure_threshold):
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self.trips += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "state": self.state,
+                "consecutive_failures": self.failures,
+                "trips": self.trips,
+                "rejected": self.rejected,
+            }
+
+
+class TokenBucket:
+    """Async token bucket: rate tokens per second, bursts of up to capacity"""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.waits = 0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                self.waits += 1
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class VerificationEngine:
+    """
+    Runs Telegram and TON verification calls on one asyncio loop in a daemon
+    thread, sharing a single aiohttp session.
+
+    Flask handlers call run(coro, deadline): the calling worker thread only
+    waits on a future, and gives up (cancelling the call) once the deadline
+    passes, instead of being held by a slow upstream. Many requests' checks
+    run concurrently on the loop, and every Bot API call goes through one
+    token bucket so the process as a whole stays under Telegram's rate caps.
+    """
+
+    def __init__(self, bot_token: Optional[str], rate_limit: float = 30, burst: int = 30,
+                 max_connections: int = 100, request_timeout: float = 10,
+                 failure_threshold: int = 5, reset_timeout: float = 30,
+                 api_base: str = "https://api.telegram.org"):
+        self.bot_token = bot_token
+        self.rate_limit = rate_limit
+        self.burst = burst
+        self.max_connections = max_connections
+        self.request_timeout = request_timeout
+        self.api_base = api_base
+        self.breakers = {
+            upstream: CircuitBreaker(upstream, failure_threshold, reset_timeout)
+            for upstream in ("telegram", "ton")
+        }
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._bucket: Optional[TokenBucket] = None
+        self._start_lock = threading.Lock()
+        self._in_flight = 0
+        self._timeouts = 0
+
+    def _ensure_started(self) -> asyncio.AbstractEventLoop:
+        with self._start_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=self._run_loop, args=(loop,), name="verification-loop", daemon=True
+                ).start()
+                self._loop = loop
+            return self._loop
+
+    @staticmethod
+    def _run_loop(loop: asyncio.AbstractEventLoop):
+        asyncio.set_event_loop(loop)
+        loop.run_forever()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # Only ever called on the loop thread
+        if self._session is None:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections),
+                timeout=aiohttp.ClientTimeout(total=self.request_timeout),
+            )
+            self._bucket = TokenBucket(self.rate_limit, self.burst)
+        return self._session
+
+    async def _tracked(self, coro):
+        # A caller that gave up on its deadline never reads the outcome; mark it read
+        # so a call failing at the same moment isn't logged as an unhandled error
+        asyncio.current_task().add_done_callback(lambda task: task.cancelled() or task.exception())
+        self._in_flight += 1
+        try:
+            return await coro
+        finally:
+            self._in_flight -= 1
+
+    def submit(self, coro) -> concurrent.futures.Future:
+        """Schedule coro on the engine loop from any thread"""
+        return asyncio.run_coroutine_threadsafe(self._tracked(coro), self._ensure_started())
+
+    def run(self, coro, deadline, upstream: Optional[str] = None):
+        """
+        Block the calling thread until coro finishes or the deadline (a Deadline or
+        seconds) runs out. With upstream set, the call goes through that upstream's
+        circuit breaker and its outcome is recorded there.
+        """
+        timeout = deadline.remaining() if isinstance(deadline, Deadline) else deadline
+        if timeout <= 0:
+            coro.close()
+            raise VerificationTimeout("deadline already spent")
+
+        breaker = self.breakers.get(upstream)
+        if breaker and not breaker.allow():
+            coro.close()
+            raise CircuitOpen(upstream)
+
+        future = self.submit(coro)
+        try:
+            result = future.result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            self._timeouts += 1
+            if breaker:
+                breaker.record_failure()
+            raise VerificationTimeout(f"no answer within {timeout:.1f}s")
+        except Exception:
+            if breaker:
+                breaker.record_failure()
+            raise
+
+        if breaker:
+            breaker.record_success()
+        return result
+
+    def _call_timeout(self, deadline: Optional[Deadline]) -> aiohttp.ClientTimeout:
+        if deadline is None:
+            return aiohttp.ClientTimeout(total=self.request_timeout)
+        return aiohttp.ClientTimeout(total=max(0.001, min(self.request_timeout, deadline.remaining())))
+
+    async def telegram(self, method: str, params: Dict, deadline: Optional[Deadline] = None) -> Optional[Dict]:
+        """
+        Rate-limited Bot API call returning the decoded response, ok or not.
+        Raises UpstreamError when Telegram gives no usable answer.
+        """
+        # Read at call time so a token loaded from .env after import is picked up
+        bot_token = self.bot_token or os.getenv('TELEGRAM_BOT_TOKEN')
+        if not bot_token:
+            print("Telegram bot token not found")
+            return None
+        session = self._get_session()
+        await self._bucket.acquire()
+        try:
+            async with session.post(
+                f"{self.api_base}/bot{bot_token}/{method}", json=params, timeout=self._call_timeout(deadline)
+            ) as response:
+                if response.status == 429 or response.status >= 500:
+                    raise UpstreamError(f"Telegram {method} returned {response.status}")
+                return await response.json(content_type=None)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            raise UpstreamError(f"Telegram {method} failed: {e!r}") from e
+
+    async def chat_member_status(self, chat_formats: List[str], user_id: int,
+                                 deadline: Optional[Deadline] = None) -> Tuple[Optional[str], Optional[str]]:
+        """
+        getChatMember trying each chat_id format in order.
+        Returns (member status, chat_id format that worked) or (None, None).
+        """
+        for chat_format in chat_formats:
+            result = await self.telegram("getChatMember", {"chat_id": chat_format, "user_id": user_id}, deadline)
+            if result and result.get('ok'):
+                return result['result']['status'], chat_format
+            if result:
+                print(f"Telegram API error for {chat_format}: {result.get('description', result)}")
+        return None, None
+
+    async def post_json(self, url: str, payload: Dict, headers: Optional[Dict] = None,
+                        deadline: Optional[Deadline] = None) -> Tuple[int, Optional[Dict]]:
+        """POST a JSON body (e.g. to the TON verifier); returns (status, decoded body or None)"""
+        session = self._get_session()
+        try:
+            async with session.post(url, json=payload, headers=headers, timeout=self._call_timeout(deadline)) as response:
+                if response.status == 429 or response.status >= 500:
+                    raise UpstreamError(f"{url} returned {response.status}")
+                try:
+                    body = await response.json(content_type=None)
+                except ValueError:
+                    body = None
+                return response.status, body
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            raise UpstreamError(f"{url} failed: {e!r}") from e
+
+    def stats(self) -> dict:
+        return {
+            "started": self._loop is not None,
+            "in_flight": self._in_flight,
+            "timeouts": self._timeouts,
+            "rate_limit": self.rate_limit,
+            "rate_limited_waits": self._bucket.waits if self._bucket else 0,
+            "breakers": {name: breaker.stats() for name, breaker in self.breakers.items()},
+        }
+
+
+verification_engine = VerificationEngine(
+    None,
+    rate_limit=float(os.getenv('TELEGRAM_RATE_LIMIT', 30)),
+    burst=int(os.getenv('TELEGRAM_RATE_BURST', 30)),
+    max_connections=int(os.getenv('VERIFICATION_MAX_CONNECTIONS', 100)),
+    request_timeout=float(os.getenv('VERIFICATION_REQUEST_TIMEOUT', 10)),
+    failure_threshold=int(os.getenv('BREAKER_FAILURE_THRESHOLD', 5)),
+    reset_timeout=float(os.getenv('BREAKER_RESET_TIMEOUT', 30)),
+    api_base=os.getenv('TELEGRAM_API_BASE', 'https://api.telegram.org'),
+)
@@ -0,0 +1,31 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+# app.py binds its engine at import time, so point it at a scratch database first
+_tmpdir = tempfile.TemporaryDirectory()
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(_tmpdir.name, 'test.db')}"
+
+
+@pytest.fixture(scope='session')
+def app_module():
+    """The backend app module with its schema built by running every migration"""
+    import app as app_module
+    from flask_migrate import upgrade
+
+    with app_module.app.app_context():
+        upgrade(directory=os.path.join(BACKEND, 'migrations'))
+    yield app_module
+    _tmpdir.cleanup()
+
+
+@pytest.fixture
+def app_ctx(app_module):
+    with app_module.app.app_context():
+        yield app_module
+        app_module.db.session.remove()
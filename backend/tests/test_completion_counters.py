@@ -0,0 +1,73 @@
+import threading
+from decimal import Decimal
+
+
+def make_campaign(A, goal, completions):
+    creator = A.User(id=900000 + goal + completions, name='creator')
+    campaign = A.UserCampaign(
+        creator_id=creator.id, link='https://t.me/example', goal=goal, completions=completions,
+        cost=Decimal('1'), category=A.TaskCategory.SOCIAL, langs=['en'],
+    )
+    A.db.session.add_all([creator, campaign])
+    A.db.session.commit()
+    return campaign.id
+
+
+def claim_burst(A, campaign_id, claimers):
+    """Every claimer reads the campaign first, then all take a slot at once"""
+    ready = threading.Barrier(len(claimers))
+    granted = []
+    errors = []
+
+    def claim(user_id):
+        with A.app.app_context():
+            try:
+                campaign = A.db.session.get(A.UserCampaign, campaign_id)
+                campaign.total_completions  # stale read taken before anyone claims
+                # Hand the connection back (keeping the loaded values) so the pool
+                # isn't exhausted by claimers parked at the barrier
+                A.db.session.close()
+                ready.wait(timeout=30)
+                if A.take_campaign_slot(campaign, user_id) is not None:
+                    granted.append(user_id)
+                A.db.session.commit()
+            except Exception as e:
+                errors.append(e)
+            finally:
+                A.db.session.remove()
+
+    threads = [threading.Thread(target=claim, args=(user_id,)) for user_id in claimers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not errors
+    return granted
+
+
+def test_burst_across_margin_never_over_grants(app_ctx):
+    A = app_ctx
+    goal = 200
+    # Every claimer sees more than COMPLETION_EXACT_MARGIN slots left and takes the shard path
+    completions = goal - A.COMPLETION_EXACT_MARGIN - 10
+    campaign_id = make_campaign(A, goal, completions)
+
+    granted = claim_burst(A, campaign_id, range(1, 2 * (goal - completions) + 1))
+
+    campaign = A.db.session.get(A.UserCampaign, campaign_id)
+    assert len(granted) == goal - completions
+    assert campaign.total_completions == goal
+    assert campaign.status == A.CampaignStatus.COMPLETED
+
+
+def test_burst_inside_margin_never_over_grants(app_ctx):
+    A = app_ctx
+    goal = 40
+    campaign_id = make_campaign(A, goal, goal - 5)
+
+    granted = claim_burst(A, campaign_id, range(1, 21))
+
+    campaign = A.db.session.get(A.UserCampaign, campaign_id)
+    assert len(granted) == 5
+    assert campaign.total_completions == goal
+    assert campaign.status == A.CampaignStatus.COMPLETED
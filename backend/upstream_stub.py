@@ -0,0 +1,182 @@
+# upstream_stub.py
+"""
+Local stand-in for the Telegram Bot API and the TON payment verifier, for
+benchmarking the claim, deposit and buy paths offline.
+
+    python upstream_stub.py --port 8081 --latency lognormal:60:400 --error-rate 0.01 --rate-limit 30
+
+Then start the backend with
+    TELEGRAM_API_BASE=http://127.0.0.1:8081
+    TON_VERIFIER_URL=http://127.0.0.1:8081/api/v1/payments/ton-webhook
+
+Latency specs (milliseconds): fixed:MS, uniform:LOW:HIGH, lognormal:MEDIAN:P99.
+Membership is derived from a hash of (chat, user), so repeated checks agree.
+GET /stats returns request counts per method and status.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import random
+import time
+from collections import Counter
+
+from aiohttp import web
+
+
+def parse_latency(spec: str):
+    """Turn a latency spec into a function returning a delay in seconds"""
+    kind, *args = spec.split(":")
+    values = [float(a) / 1000 for a in args]
+    if kind == "fixed" and len(values) == 1:
+        return lambda: values[0]
+    if kind == "uniform" and len(values) == 2:
+        return lambda: random.uniform(values[0], values[1])
+    if kind == "lognormal" and len(values) == 2:
+        median, p99 = values
+        # 2.326 is the standard normal 99th percentile
+        sigma = math.log(p99 / median) / 2.326 if p99 > median else 0.0
+        return lambda: random.lognormvariate(math.log(median), sigma)
+    raise argparse.ArgumentTypeError(f"bad latency spec: {spec}")
+
+
+class RateLimiter:
+    """Per-bot-token token bucket; answers 429 with retry_after like the Bot API does"""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.buckets = {}
+
+    def retry_after(self, token: str) -> int:
+        """0 if the call may proceed, otherwise seconds to wait"""
+        if self.rate <= 0:
+            return 0
+        now = time.monotonic()
+        tokens, updated = self.buckets.get(token, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        if tokens >= 1:
+            self.buckets[token] = (tokens - 1, now)
+            return 0
+        self.buckets[token] = (tokens, now)
+        return max(1, math.ceil((1 - tokens) / self.rate))
+
+
+class UpstreamStub:
+    def __init__(self, args):
+        self.args = args
+        self.telegram_latency = args.telegram_latency or args.latency
+        self.ton_latency = args.ton_latency or args.latency
+        self.limiter = RateLimiter(args.rate_limit, args.rate_burst)
+        self.counts = Counter()
+
+    async def _delay(self, latency):
+        if random.random() < self.args.hang_rate:
+            await asyncio.sleep(self.args.hang_seconds)
+        else:
+            await asyncio.sleep(latency())
+
+    def _is_member(self, chat_id, user_id) -> bool:
+        digest = hashlib.blake2b(f"{chat_id}:{user_id}".encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "little") / 2 ** 64 < self.args.member_rate
+
+    async def _params(self, request) -> dict:
+        params = dict(request.query)
+        if request.can_read_body:
+            if request.content_type == "application/json":
+                params.update(await request.json())
+            else:
+                params.update(await request.post())
+        return params
+
+    async def telegram(self, request):
+        token, method = request.match_info["token"], request.match_info["method"]
+        await self._delay(self.telegram_latency)
+
+        retry_after = self.limiter.retry_after(token)
+        if retry_after:
+            return self._reply(method, 429, {
+                "ok": False, "error_code": 429,
+                "description": f"Too Many Requests: retry after {retry_after}",
+                "parameters": {"retry_after": retry_after},
+            }, headers={"Retry-After": str(retry_after)})
+        if random.random() < self.args.error_rate:
+            return self._reply(method, 502, {"ok": False, "error_code": 502, "description": "Bad Gateway"})
+
+        params = await self._params(request)
+        chat_id = str(params.get("chat_id", ""))
+        bot = {"id": 1000000001, "is_bot": True, "first_name": "Stub", "username": "stub_bot"}
+
+        if method == "getMe":
+            return self._reply(method, 200, {"ok": True, "result": bot})
+        if method in ("getChat", "getChatMember", "getChatAdministrators") and not chat_id:
+            return self._reply(method, 400, {"ok": False, "error_code": 400, "description": "Bad Request: chat not found"})
+        if method == "getChat":
+            return self._reply(method, 200, {"ok": True, "result": {
+                "id": -1000000000000 - int(hashlib.blake2b(chat_id.lstrip("@").lower().encode(), digest_size=4).hexdigest(), 16),
+                "type": "channel", "title": chat_id.lstrip("@"), "username": chat_id.lstrip("@"),
+            }})
+        if method == "getChatAdministrators":
+            return self._reply(method, 200, {"ok": True, "result": [
+                {"user": bot, "status": "administrator", "can_manage_chat": True},
+            ]})
+        if method == "getChatMember":
+            user_id = int(params.get("user_id", 0))
+            status = "member" if self._is_member(chat_id.lstrip("@").lower(), user_id) else "left"
+            return self._reply(method, 200, {"ok": True, "result": {
+                "user": {"id": user_id, "is_bot": False, "first_name": str(user_id)}, "status": status,
+            }})
+        return self._reply(method, 404, {"ok": False, "error_code": 404, "description": "Not Found"})
+
+    async def ton_verify(self, request):
+        await self._delay(self.ton_latency)
+        if random.random() < self.args.error_rate:
+            return self._reply("ton-webhook", 502, {"error": "Bad Gateway"})
+        await request.read()
+        return self._reply("ton-webhook", 200, {"valid": random.random() < self.args.ton_valid_rate})
+
+    async def stats(self, request):
+        counts = {}
+        for (method, status), count in self.counts.items():
+            counts.setdefault(method, {})[str(status)] = count
+        return web.json_response(counts)
+
+    def _reply(self, method, status, body, headers=None):
+        self.counts[(method, status)] += 1
+        return web.Response(status=status, text=json.dumps(body), content_type="application/json", headers=headers)
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_route("*", "/bot{token}/{method}", self.telegram)
+        app.router.add_post("/api/v1/payments/ton-webhook", self.ton_verify)
+        app.router.add_get("/stats", self.stats)
+        return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub Telegram Bot API and TON verifier")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency", type=parse_latency, default=parse_latency("lognormal:60:400"),
+                        help="latency for both upstreams (default lognormal:60:400)")
+    parser.add_argument("--telegram-latency", type=parse_latency, default=None)
+    parser.add_argument("--ton-latency", type=parse_latency, default=None)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of calls answered 502")
+    parser.add_argument("--hang-rate", type=float, default=0.0,
+                        help="fraction of calls that stall for --hang-seconds (client timeouts)")
+    parser.add_argument("--hang-seconds", type=float, default=60)
+    parser.add_argument("--rate-limit", type=float, default=30,
+                        help="Bot API calls per second per token before 429s; 0 disables")
+    parser.add_argument("--rate-burst", type=int, default=30)
+    parser.add_argument("--member-rate", type=float, default=0.8, help="fraction of (chat, user) pairs that are members")
+    parser.add_argument("--ton-valid-rate", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    web.run_app(UpstreamStub(args).app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
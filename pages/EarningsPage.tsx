@@ -6,7 +6,7 @@ import {
   fetchAllCampaignsAPI,
   startTask,
   claimTask,
-  getUserTaskStatus,
+  getCampaignTaskStatus,
   startDailyTask,
   getUserDailyTaskStatus,
   redeemPromoCode,
@@ -231,6 +231,8 @@ const TaskSection: React.FC<{
 // ---------------- Main Earnings Page ----------------
 const EarningsPage: React.FC<{ setUser: (user: User) => void; user: User }> = ({ setUser, user }) => {
   const [campaigns, setCampaigns] = useState<UserCampaign[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [dailyTasks, setDailyTasks] = useState<DailyTask[]>([]);
   const [taskStatuses, setTaskStatuses] = useState<Record<string, { started: boolean; completed: boolean }>>({});
   const [dailyTaskStatuses, setDailyTaskStatuses] = useState<Record<string, { started: boolean; completed: boolean; claimed: boolean }>>({});
@@ -250,13 +252,15 @@ const EarningsPage: React.FC<{ setUser: (user: User) => void; user: User }> = ({
 
   const loadAllData = async () => {
     try {
-      const campaignsData = await fetchAllCampaignsAPI(user.id);
+      const campaignsPage = await fetchAllCampaignsAPI(user.id);
+      const campaignsData = campaignsPage.items;
       setCampaigns(campaignsData);
+      setNextCursor(campaignsPage.nextCursor);
 
       const dailyTasksData = await fetchIncompleteDailyTasks(user.id);
       setDailyTasks(dailyTasksData);
 
-      const statusResponse = await getUserTaskStatus(user.id);
+      const statusResponse = await getCampaignTaskStatus(campaignsData.map(c => Number(c.id)));
       if (statusResponse.success) {
         setTaskStatuses(statusResponse.taskStatuses);
       }
@@ -270,6 +274,25 @@ const EarningsPage: React.FC<{ setUser: (user: User) => void; user: User }> = ({
     }
   };
 
+  const loadMoreCampaigns = async () => {
+    if (!nextCursor || loadingMore) return;
+    setLoadingMore(true);
+    try {
+      const page = await fetchAllCampaignsAPI(user.id, nextCursor);
+      setCampaigns(prev => [...prev, ...page.items]);
+      setNextCursor(page.nextCursor);
+
+      const statusResponse = await getCampaignTaskStatus(page.items.map(c => Number(c.id)));
+      if (statusResponse.success) {
+        setTaskStatuses(prev => ({ ...prev, ...statusResponse.taskStatuses }));
+      }
+    } catch (error) {
+      console.error("Error loading more campaigns:", error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   // ---- Ad handling function - use the same approach as SpinWheel page ----
   const showAdIfAvailable = async (): Promise<boolean> => {
     try {
@@ -522,6 +545,16 @@ const EarningsPage: React.FC<{ setUser: (user: User) => void; user: User }> = ({
             getTaskButtonState={getTaskButtonState}
             TaskComponent={CampaignTaskItem}
           />
+
+          {nextCursor && (
+            <button
+              onClick={loadMoreCampaigns}
+              disabled={loadingMore}
+              className="w-full bg-slate-700 text-white font-semibold py-3 rounded-lg transition-colors hover:bg-slate-600 disabled:opacity-50"
+            >
+              {loadingMore ? 'Loading...' : 'Load more tasks'}
+            </button>
+          )}
         </div>
       </div>
     </div>
@@ -16,7 +16,9 @@ interface MyPartnerTasksComponentProps {
 
 const MyPartnerTasksComponent: React.FC<MyPartnerTasksComponentProps> = ({ userid, user, setUser, onAddFunds, onCampaignsUpdate }) => {
   const [campaigns, setCampaigns] = useState<PartnerCampaign[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [reactivating, setReactivating] = useState<number | null>(null);
 
   useEffect(() => {
@@ -25,8 +27,9 @@ const MyPartnerTasksComponent: React.FC<MyPartnerTasksComponentProps> = ({ useri
 
   const loadCampaigns = async () => {
     try {
-      const data = await fetchUserCampaignsPartnerAPI(userid);
-      setCampaigns(data);
+      const page = await fetchUserCampaignsPartnerAPI(userid);
+      setCampaigns(page.items);
+      setNextCursor(page.nextCursor);
     } catch (error) {
       console.error('Error loading campaigns:', error);
     } finally {
@@ -34,6 +37,20 @@ const MyPartnerTasksComponent: React.FC<MyPartnerTasksComponentProps> = ({ useri
     }
   };
 
+  const loadMoreCampaigns = async () => {
+    if (!nextCursor || loadingMore) return;
+    setLoadingMore(true);
+    try {
+      const page = await fetchUserCampaignsPartnerAPI(userid, nextCursor);
+      setCampaigns(prev => [...prev, ...page.items]);
+      setNextCursor(page.nextCursor);
+    } catch (error) {
+      console.error('Error loading more campaigns:', error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleReactivate = async (campaignId: number) => {
     if (!user) return;
     
@@ -132,6 +149,15 @@ const MyPartnerTasksComponent: React.FC<MyPartnerTasksComponentProps> = ({ useri
           </div>
         ))
       )}
+      {nextCursor && (
+        <button
+          onClick={loadMoreCampaigns}
+          disabled={loadingMore}
+          className="w-full bg-slate-700 text-white font-semibold py-2 rounded-lg text-sm hover:bg-slate-600 transition-colors disabled:opacity-50"
+        >
+          {loadingMore ? 'Loading...' : 'Load more'}
+        </button>
+      )}
     </div>
   );
 };
@@ -16,7 +16,9 @@ interface MyTasksComponentProps {
 
 const MyTasksComponent: React.FC<MyTasksComponentProps> = ({ userid, user, setUser, onAddFunds, onCampaignsUpdate }) => {
   const [campaigns, setCampaigns] = useState<UserCampaign[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [reactivating, setReactivating] = useState<number | null>(null);
 
   useEffect(() => {
@@ -25,8 +27,9 @@ const MyTasksComponent: React.FC<MyTasksComponentProps> = ({ userid, user, setUs
 
   const loadCampaigns = async () => {
     try {
-      const data = await fetchUserCampaignsAPI(userid);
-      setCampaigns(data);
+      const page = await fetchUserCampaignsAPI(userid);
+      setCampaigns(page.items);
+      setNextCursor(page.nextCursor);
     } catch (error) {
       console.error('Error loading campaigns:', error);
     } finally {
@@ -34,6 +37,20 @@ const MyTasksComponent: React.FC<MyTasksComponentProps> = ({ userid, user, setUs
     }
   };
 
+  const loadMoreCampaigns = async () => {
+    if (!nextCursor || loadingMore) return;
+    setLoadingMore(true);
+    try {
+      const page = await fetchUserCampaignsAPI(userid, nextCursor);
+      setCampaigns(prev => [...prev, ...page.items]);
+      setNextCursor(page.nextCursor);
+    } catch (error) {
+      console.error('Error loading more campaigns:', error);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleReactivate = async (campaignId: number) => {
     if (!user) return;
     
@@ -119,6 +136,15 @@ const MyTasksComponent: React.FC<MyTasksComponentProps> = ({ userid, user, setUs
           </div>
         ))
       )}
+      {nextCursor && (
+        <button
+          onClick={loadMoreCampaigns}
+          disabled={loadingMore}
+          className="w-full bg-slate-700 text-white font-semibold py-2 rounded-lg text-sm hover:bg-slate-600 transition-colors disabled:opacity-50"
+        >
+          {loadingMore ? 'Loading...' : 'Load more'}
+        </button>
+      )}
     </div>
   );
 };
@@ -203,7 +203,8 @@ const handleUnauthorized = async (): Promise<boolean> => {
 export const apiFetch = async <T = any>(
   endpoint: string,
   options: RequestInit = {},
-  retry = true
+  retry = true,
+  onResponse?: (response: Response) => void
 ): Promise<T> => {
   const headers: HeadersInit = {
     'Content-Type': 'application/json',
@@ -259,7 +260,7 @@ export const apiFetch = async <T = any>(
         const refreshed = await handleUnauthorized();
         if (refreshed) {
           console.log(`[apiFetch] Token refreshed, retrying request to ${endpoint}`);
-          return apiFetch(endpoint, options, false);
+          return apiFetch(endpoint, options, false, onResponse);
         }
       }
 
@@ -292,7 +293,7 @@ export const apiFetch = async <T = any>(
       const refreshed = await handleUnauthorized();
       if (refreshed) {
         console.log(`[apiFetch] Token refreshed, retrying request to ${endpoint}`);
-        return apiFetch(endpoint, options, false);
+        return apiFetch(endpoint, options, false, onResponse);
       }
     }
 
@@ -322,6 +323,8 @@ export const apiFetch = async <T = any>(
       throw { status: response.status, data: errorData };
     }
 
+    onResponse?.(response);
+
     if (response.status === 204) {
       console.log(`[apiFetch] No content (204) from ${endpoint}`);
       return null as T;
@@ -427,25 +430,43 @@ export const loginWithTelegram = async (telegramInitData: string): Promise<User>
 
 
 
-// Campaign API functions - FIXED to use apiFetch correctly
-export const fetchAllCampaignsAPI = async (userId: number): Promise<(UserCampaign | PartnerCampaign)[]> => {
-  return apiFetch<(UserCampaign | PartnerCampaign)[]>(`/usercampaigns/unclaimed?user_id=${userId}`, {
-    method: 'GET',
+// Campaign feeds are paged server-side. Each call returns one page plus the
+// cursor for the next; callers ask for more only when the user wants them.
+export interface Page<T> {
+  items: T[];
+  nextCursor: string | null;
+}
+
+const fetchPage = async <T>(endpoint: string, cursor?: string | null): Promise<Page<T>> => {
+  const url = cursor ? `${endpoint}&cursor=${encodeURIComponent(cursor)}` : endpoint;
+  let nextCursor: string | null = null;
+  const items = await apiFetch<T[]>(url, { method: 'GET' }, true, (response) => {
+    nextCursor = response.headers.get('X-Next-Cursor');
   });
+  return { items: items || [], nextCursor };
+};
+
+// Campaign API functions - FIXED to use apiFetch correctly
+export const fetchAllCampaignsAPI = async (
+  userId: number,
+  cursor?: string | null
+): Promise<Page<UserCampaign | PartnerCampaign>> => {
+  return fetchPage<UserCampaign | PartnerCampaign>(`/usercampaigns/unclaimed?user_id=${userId}`, cursor);
 };
 
 
-export const fetchUserCampaignsAPI = async (userId: number): Promise<(UserCampaign | PartnerCampaign)[]> => {
-  return apiFetch<(UserCampaign | PartnerCampaign)[]>(`/my-campaigns?user_id=${userId}`, {
-    method: 'GET',
-  });
+export const fetchUserCampaignsAPI = async (
+  userId: number,
+  cursor?: string | null
+): Promise<Page<UserCampaign | PartnerCampaign>> => {
+  return fetchPage<UserCampaign | PartnerCampaign>(`/my-campaigns?user_id=${userId}`, cursor);
 };
 
-export const fetchUserCampaignsPartnerAPI = async (userId: number): Promise<PartnerCampaign[]> => {
-  const data = await apiFetch<PartnerCampaign[]>(`/my-partnercampaigns?user_id=${userId}`, {
-    method: 'GET',
-  });
-  return data;
+export const fetchUserCampaignsPartnerAPI = async (
+  userId: number,
+  cursor?: string | null
+): Promise<Page<PartnerCampaign>> => {
+  return fetchPage<PartnerCampaign>(`/my-partnercampaigns?user_id=${userId}`, cursor);
 };
 
 
@@ -515,23 +536,24 @@ export const addUserCampaignAPI = async (
 
 
 
-// In your services/api.ts file
+export const getCampaignTaskStatus = async (
+  campaignIds: number[],
+  since?: string
+): Promise<{
+  success: boolean;
+  taskStatuses: Record<string, { started: boolean; completed: boolean }>;
+  completedCampaignIds: number[];
+  asOf: string;  // pass back as `since` to only get changes
+}> => {
+  return apiFetch(`/api/campaigns/completion-status`, {
+    method: 'POST',
+    body: JSON.stringify({ campaignIds, since }),
+  });
+};
+
 export const checkCampaignCompletion = async (campaignIds: number[]): Promise<number[]> => {
   try {
-    // This would be an API call to your backend to check which campaigns the user has completed
-    const response = await fetch('/api/campaigns/completion-status', {
-      method: 'POST',
-      headers: {
-        'Content-Type': 'application/json',
-      },
-      body: JSON.stringify({ campaignIds }),
-    });
-    
-    if (!response.ok) {
-      throw new Error('Failed to check campaign completion status');
-    }
-    
-    const data = await response.json();
+    const data = await getCampaignTaskStatus(campaignIds);
     return data.completedCampaignIds || [];
   } catch (error) {
     console.error('Error checking campaign completion:', error);
@@ -556,6 +578,20 @@ export const startTask = async (
   });
 };
 
+export const startTasks = async (
+  userId: number,
+  taskIds: number[]
+): Promise<{
+  success: boolean;
+  message?: string;
+  results?: Record<string, 'new' | 'started' | 'completed' | 'not_found'>;
+}> => {
+  return apiFetch(`/tasks/start`, {
+    method: "POST",
+    body: JSON.stringify({ userId, taskIds }),
+  });
+};
+
 export const claimTask = async (
   userId: number,
   taskId: number
@@ -564,6 +600,7 @@ export const claimTask = async (
   message: string; 
   user?: User;
   reward?: number;
+  pending?: boolean;
 }> => {
   return apiFetch(`/tasks/claim`, {
     method: "POST",
@@ -56,7 +56,7 @@ export interface User {
   spaceDefenderProgress: SpaceDefenderProgress;
   streetRacingProgress: StreetRacingProgress;
   banned: boolean;
-  friends: number[];  // backend returns list of friend IDs
+  friends?: number[];  // only returned by admin endpoints with ?include_friends=true
 }
 
 